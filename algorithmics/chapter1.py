@@ -1,10 +1,13 @@
 # 1.4
-from typing import List
-import logging
+from functools import lru_cache
+from typing import List, Tuple
 
-# set to debug to see 'print' statements
-logging.basicConfig()
-logging.getLogger().setLevel(logging.DEBUG)
+import numpy as np
+
+from instrument import record
+
+# NOTE operation counts used to be logging.debug'd with DEBUG on at import,
+# now they go to instrument.record, wrap calls in instrument.collect() to see them
 
 
 T = [3, 1, 4, 1, 5, 9, 2, 6, 5, 3]
@@ -24,45 +27,70 @@ V = [6, 5, 4, 3, 2, 1]
 def insert(T: List[int]) -> List[int]:
     """best case, the list is sorted: touch each element once, n operations
     worse case, list is reverse sorted: sum(1:n) operations loop_cnt = (sum(1:n-1))"""
-    operations = 0
-    for i, x in enumerate(T):
+    iterations, comparisons, swaps = insert_range(T, 0, len(T))
+    record(
+        "insert",
+        operations=iterations + swaps,
+        iterations=iterations,
+        comparisons=comparisons,
+        swaps=swaps,
+    )
+    return T
+
+
+def insert_range(T: List[int], lo: int, hi: int) -> Tuple[int, int, int]:
+    """insert on T[lo:hi] in place, returns (iterations, comparisons, swaps)
+    (run_sort.py uses this to grow short runs)"""
+    comparisons = 0
+    swaps = 0
+    for i in range(lo, hi):
+        x = T[i]
         j = i - 1
-        operations += 1
-        while j > -1 and x < T[j]:
+        while j > lo - 1 and x < T[j]:
             T[j + 1] = T[j]
             j = j - 1
-            operations += 1
+            swaps += 1
         T[j + 1] = x
-    logging.debug(operations)
-    return T
+        # every shift was a comparison, plus the one that stopped the loop
+        comparisons += j > lo - 1
+    return hi - lo, comparisons + swaps, swaps
 
 
 def select(T: List[int]) -> List[int]:
     """the order of the sorted list doesn't matter here
     i.e. cnt of operations for U and V are identical
     as opposed to insert where U has 6 operations and V has 21"""
-    operations = 0
-    for i in range(len(T)-1):
+    n = len(T)
+    for i in range(n-1):
         minj = i
         minx = T[i]
-        operations += 1
-        for j in range(i+1, len(T)):
-            operations += 1
+        for j in range(i+1, n):
             if T[j] < minx:
                 minj = j
                 minx = T[j]
         T[minj] = T[i]
         T[i] = minx
-    logging.debug(operations)
+    # the inner loop always runs to the end, so the counts only depend on n
+    iterations = max(n - 1, 0)
+    comparisons = n * (n - 1) // 2
+    record(
+        "select",
+        operations=iterations + comparisons,
+        iterations=iterations,
+        comparisons=comparisons,
+        swaps=iterations,
+    )
     return T
 
 
-# def _insert_worst_case(N: int) -> int:
-#     """worse case number of operations for insert given N elements"""
-#     return sum([i+1 for i in range(N)])
+# complexity.py measures these empirically and fits them to O(n^2)
+def _insert_worst_case(N: int) -> int:
+    """worse case number of operations for insert given N elements"""
+    return sum([i+1 for i in range(N)])
 
-# def _select_worst_case(N: int) -> int:
-#     pass
+def _select_worst_case(N: int) -> int:
+    """select does the same work for every input: N-1 outer + N(N-1)/2 inner"""
+    return max(N - 1, 0) + N * (N - 1) // 2
 
 # =================================================================
 #	Problem 1.5.1 **
@@ -81,59 +109,195 @@ def select(T: List[int]) -> List[int]:
 # I see that when m > n the number of operations increases by a factor of m/n
 # i.e. n,m = 5,13 this results in 16 operations. n,m=13,5 there are 42 operations
 # which is ~= 13/5 * 16
+# NOTE the operation count only depends on a: one row per bit of a, 2
+# operations (halve a, double b) to make each row after the first, 1 to look
+# at each row on the way back and 1 more per odd row (a 1 bit) added in, i.e.
+#   operations = 2 (L - 1) + L + popcount(a),  L = a.bit_length()
+# swapping a and b changes L, which is why russe(13, 5) costs more than
+# russe(5, 13)
 def russe(a: int, b: int) -> int:
     """russe multiplication of a and b
     a: multiplier, the number that divides by 2 each time
-    b: multiplicand, thnoe number that is multipled by 2 each time"""
-    x: list = [a]
-    y: list = [b]
-    i = 0
-    operations = 0
-    while x[i] > 1:
-        x.append(x[i] // 2)
-        y.append(y[i] + y[i])
-        i += 1
-        logging.debug(f"i={i}, x={x}, y={y}")
-        operations += 2
-    # sum only odd numbers
+    b: multiplicand, thnoe number that is multipled by 2 each time
+
+    the book writes the halvings and doublings into two columns and then
+    walks them back, here each row is used as soon as it is made
+    (a shift and an add), so no lists are built"""
+    x, y = a, b
     prod = 0
-    while i >= 0:
-        if x[i] % 2 != 0:
-            prod += y[i]
-            operations += 1
-        logging.debug(f"i={i}, prod={prod}")
-        i -= 1
-        operations += 1
-    logging.debug(f"{operations} operations")
-    logging.debug(f"bit length: m={a.bit_length()}, n={b.bit_length()}")
+    halvings = 0
+    additions = 0
+    while True:
+        # sum only odd rows
+        if x & 1:
+            prod += y
+            additions += 1
+        if x <= 1:
+            break
+        x >>= 1
+        y += y
+        halvings += 1
+    record(
+        "russe",
+        operations=3 * halvings + 1 + additions,
+        iterations=halvings,
+        additions=additions,
+        bit_length_a=a.bit_length(),
+        bit_length_b=b.bit_length(),
+    )
     return prod
 
+
+def russe_batch(a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """russe over arrays of int64 pairs, returns (products, operations)
+
+    every pair walks its bits in lock step, one vectorized shift-and-add per
+    bit of the longest multiplier. products wrap around past 2**63 like any
+    int64 math, operations are the same counts russe records
+    """
+    x = np.asarray(a, dtype=np.int64).copy()
+    y = np.asarray(b, dtype=np.int64).copy()
+    prod = np.zeros(np.broadcast(x, y).shape, dtype=np.int64)
+    rows = np.zeros(prod.shape, dtype=np.int64)
+    additions = np.zeros(prod.shape, dtype=np.int64)
+    while (x > 0).any():
+        odd = (x & 1).astype(bool)
+        prod += np.where(odd, y, 0)
+        additions += odd
+        rows += x > 0
+        x >>= 1
+        y <<= 1
+    # a = 0 still looks at its one row
+    rows = np.maximum(rows, 1)
+    return prod, 3 * (rows - 1) + 1 + additions
+
 # a, b = 45, 1945
 
+# NOTE trial division is O(min(m, n)), see number_theory.py for binary gcd,
+# extended euclid and batch versions
 def gcd(m: int, n: int) -> int:
     """greatest common denominator"""
     a,b = (m,n) if m < n else (n,m)
     for i in range(a):
         if a % (a - i) == 0 and b % (a - i) == 0:
+            record("gcd", iterations=i + 1)
             return a - i
+    record("gcd", iterations=a)
     return 1
 
 def euclid(m: int, n: int) -> int:
     """log n efficient algorithm to find gcd"""
+    iterations = 0
     while m > 0:
         t = n % m
         n = m
         m = t
+        iterations += 1
+    record("euclid", iterations=iterations)
     return n
 
-def fib(n: int) -> int:
+# NOTE the first version did `f1 += f0; f0 = f1`, which doubles f1 every loop
+# (1, 2, 4, 8, ...) instead of computing fibonacci numbers
+def fib_linear(n: int) -> int:
+    """F(n) by walking the sequence, n additions"""
     f0, f1 = 0, 1
-    operations = 1
     for _ in range(n):
-        f1 += f0
-        # logging.debug(f1)
-        f0 = f1
+        f0, f1 = f1, f0 + f1
+    return f0
+
+
+# fast doubling: from F(k) and F(k+1)
+#   F(2k)   = F(k) * (2 F(k+1) - F(k))
+#   F(2k+1) = F(k)^2 + F(k+1)^2
+# so walking the bits of n from the top gives F(n) in log2(n) steps
+def fib(n: int) -> int:
+    """F(n) with F(0) = 0, F(1) = 1, O(log n) steps"""
+    a, b = 0, 1  # F(0), F(1)
+    operations = 0
+    for bit in bin(n)[2:] if n else "":
+        c = a * (2 * b - a)
+        d = a * a + b * b
+        a, b = (d, c + d) if bit == "1" else (c, d)
         operations += 1
-        logging.debug(f"operations: {operations}")
-    return f1
-        
\ No newline at end of file
+    record("fib", operations=operations, iterations=n.bit_length())
+    return a
+
+
+def fib_mod(n: int, m: int) -> int:
+    """F(n) mod m, the numbers never grow past m so n can be huge"""
+    a, b = 0, 1 % m
+    for bit in bin(n)[2:] if n else "":
+        c = a * (2 * b - a) % m
+        d = (a * a + b * b) % m
+        a, b = (d, (c + d) % m) if bit == "1" else (c, d)
+    return a
+
+
+@lru_cache(maxsize=64)
+def _fib_pair(n: int) -> Tuple[int, int]:
+    """(F(n), F(n+1)), cached: n and n // 2 share everything below them"""
+    if n == 0:
+        return 0, 1
+    a, b = _fib_pair(n >> 1)
+    c = a * (2 * b - a)
+    d = a * a + b * b
+    return (d, c + d) if n & 1 else (c, d)
+
+
+# a big multiply costs far more than a big add, so an n close to one already
+# computed is reached by walking forward instead of doubling from scratch
+WALK = 256
+
+
+def fib_batch(ns: List[int]) -> List[int]:
+    """F(n) for every n, sharing work between the ns and with earlier calls"""
+    answers = {}
+    a, b, at = 0, 1, 0  # F(at), F(at + 1)
+    for n in sorted(set(ns)):
+        if n - at > WALK:
+            # far away, double from scratch (cached doubling prefixes help here)
+            a, b = _fib_pair(n)
+        else:
+            for _ in range(n - at):
+                a, b = b, a + b
+        at = n
+        answers[n] = a
+    return [answers[n] for n in ns]
+
+
+if __name__ == "__main__":
+    import time
+
+    for n in (10**4, 10**5, 10**6, 10**7):
+        start = time.perf_counter()
+        fast = fib(n)
+        fast_seconds = time.perf_counter() - start
+        if n <= 10**6:
+            start = time.perf_counter()
+            assert fib_linear(n) == fast
+            linear = f"{time.perf_counter() - start:8.3f} s"
+        else:
+            linear = "(skipped)"
+        print(f"F({n:,}): doubling {fast_seconds:8.3f} s, linear {linear}")
+
+    ns = [10**6 + k for k in range(0, 1000, 7)]
+    start = time.perf_counter()
+    fib_batch(ns)
+    print(f"batch of {len(ns)} near 10^6: {time.perf_counter() - start:8.3f} s")
+    start = time.perf_counter()
+    [fib(n) for n in ns]
+    print(f"same ns one by one:    {time.perf_counter() - start:8.3f} s")
+
+    # russe operation counts on 10^6 pairs, grouped by the bit length of a
+    rng = np.random.default_rng(0)
+    # spread the sizes of a evenly over 1..31 bits
+    a = rng.integers(1, 2**31, size=10**6) >> rng.integers(0, 31, size=10**6)
+    a = np.maximum(a, 1)
+    b = rng.integers(1, 2**31, size=10**6)
+    start = time.perf_counter()
+    products, operations = russe_batch(a, b)
+    print(f"russe_batch on 10^6 pairs: {time.perf_counter() - start:8.3f} s")
+    assert (products == a * b).all()
+    bits = np.floor(np.log2(a)).astype(int) + 1
+    for length in (1, 8, 16, 24, 31):
+        print(f"  a of {length:>2} bits: {operations[bits == length].mean():6.2f} operations")
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+
+"""
+Measure the chapter 1 algorithms and fit their growth to a big-O model.
+
+Answers the "how do i calculate that this is quadratic time?" question in
+chapter1.py empirically: run each algorithm on inputs that double in size,
+record the wall time and operation counts, and see which of O(1), O(log n),
+O(n), O(n log n), O(n^2) fits the measurements best.
+
+Usage:
+$ python complexity.py
+$ python complexity.py --output new.json --compare complexity.json
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import time
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from chapter1 import (
+    _insert_worst_case,
+    _select_worst_case,
+    euclid,
+    fib,
+    gcd,
+    insert,
+    russe,
+    select,
+)
+from instrument import collect
+
+MODELS: Dict[str, Callable[[int], float]] = {
+    "O(1)": lambda n: 1.0,
+    "O(log n)": lambda n: math.log2(n),
+    "O(n)": lambda n: float(n),
+    "O(n log n)": lambda n: n * math.log2(n),
+    "O(n^2)": lambda n: float(n * n),
+}
+
+# the book's operation count for the worst input, stored next to the measurement
+WORST_CASE = {"insert": _insert_worst_case, "select": _select_worst_case}
+
+
+class Fit(NamedTuple):
+    model: str
+    coefficient: float
+    # spread of log(measured / model), 0 is a perfect fit
+    error: float
+
+
+def fit(sizes: List[int], values: List[float]) -> Fit:
+    """the model whose shape matches the measurements best
+
+    in log space every model is log y = log c + log f(n), so the best c is the
+    mean of log y - log f(n) and what is left over says how well the shape fits
+    """
+    best = None
+    for model, f in MODELS.items():
+        points = [(n, y) for n, y in zip(sizes, values) if y > 0 and f(n) > 0]
+        if len(points) < 2:
+            continue
+        logs = [math.log(y) - math.log(f(n)) for n, y in points]
+        mean = sum(logs) / len(logs)
+        error = math.sqrt(sum((x - mean) ** 2 for x in logs) / len(logs))
+        # a tiny tolerance so a flat line prefers the simplest model
+        if best is None or error < best.error - 1e-9:
+            best = Fit(model, math.exp(mean), error)
+    return best or Fit("O(1)", values[0] if values else 0.0, 0.0)
+
+
+# =================================================================
+#	inputs
+# =================================================================
+# sorts get the same shapes as T/U/V: random, sorted, reversed.
+# the number theory ones get n as the size of the operands.
+
+def sort_input(shape: str, rng: random.Random) -> Callable[[int], Tuple]:
+    def build(n: int) -> Tuple:
+        if shape == "sorted":  # like U
+            return (list(range(n)),)
+        if shape == "reversed":  # like V
+            return (list(range(n, 0, -1)),)
+        return ([rng.randrange(n) for _ in range(n)],)  # like T
+
+    return build
+
+
+def geometric(start: int, stop: int) -> List[int]:
+    return [2 ** k for k in range(start, stop + 1)]
+
+
+def cases(rng: random.Random) -> List[Tuple[str, str, Callable, Callable, List[int]]]:
+    """(algorithm, shape, function, build(n) -> args, sizes)"""
+    table = []
+    for shape in ("random", "sorted", "reversed"):
+        table.append(("insert", shape, insert, sort_input(shape, rng), geometric(4, 11)))
+        table.append(("select", shape, select, sort_input(shape, rng), geometric(4, 11)))
+    table += [
+        # a is the halving operand, so it sets the loop count
+        ("russe", "random", russe, lambda n: (n, rng.randrange(1, n)), geometric(4, 40)),
+        # consecutive numbers are coprime, the trial division worst case
+        ("gcd", "consecutive", gcd, lambda n: (n, n + 1), geometric(4, 16)),
+        ("gcd", "random", gcd, lambda n: (rng.randrange(1, n), n), geometric(4, 16)),
+        ("euclid", "random", euclid, lambda n: (rng.randrange(1, n), n), geometric(4, 60)),
+        ("fib", "n", fib, lambda n: (n,), geometric(4, 14)),
+    ]
+    return table
+
+
+# =================================================================
+#	measure
+# =================================================================
+
+def fresh(args: Tuple) -> Tuple:
+    """sorts work in place, every run gets its own copy of a list"""
+    return tuple(list(a) if isinstance(a, list) else a for a in args)
+
+
+def measure(function: Callable, args: Tuple, repeat: int) -> Tuple[float, Dict[str, int]]:
+    """best of `repeat` wall times and the counters of one call"""
+    best = math.inf
+    for _ in range(repeat):
+        copy = fresh(args)
+        start = time.perf_counter()
+        function(*copy)
+        best = min(best, time.perf_counter() - start)
+    with collect() as stats:
+        function(*fresh(args))
+    return best, stats.last(function.__name__)
+
+
+def run(repeat: int, seed: int) -> Dict:
+    rng = random.Random(seed)
+    results = []
+    fits = {}
+    for algorithm, shape, function, build, sizes in cases(rng):
+        rows = []
+        for n in sizes:
+            seconds, counts = measure(function, build(n), repeat)
+            row = {"n": n, "seconds": seconds, "counts": counts}
+            if algorithm in WORST_CASE:
+                row["worst_case"] = WORST_CASE[algorithm](n)
+            rows.append(row)
+        results.append({"algorithm": algorithm, "shape": shape, "rows": rows})
+
+        key = f"{algorithm}/{shape}"
+        fits[key] = {
+            "seconds": fit(sizes, [row["seconds"] for row in rows])._asdict(),
+            # gcd/euclid only count iterations
+            "operations": fit(
+                sizes,
+                [row["counts"].get("operations", row["counts"]["iterations"]) for row in rows],
+            )._asdict(),
+        }
+        print(
+            f"{key:>20}: operations {fits[key]['operations']['model']:>10}, "
+            f"time {fits[key]['seconds']['model']:>10}"
+        )
+    return {
+        "python": platform.python_version(),
+        "seed": seed,
+        "results": results,
+        "fits": fits,
+    }
+
+
+def compare(previous: Dict, current: Dict) -> List[str]:
+    """fits whose operation-count model changed between two runs"""
+    changes = []
+    for key, fits in current["fits"].items():
+        before = previous.get("fits", {}).get(key)
+        if before and before["operations"]["model"] != fits["operations"]["model"]:
+            changes.append(
+                f"{key}: {before['operations']['model']} -> {fits['operations']['model']}"
+            )
+    return changes
+
+
+def main():
+    """Script entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", default="complexity.json")
+    parser.add_argument("--compare", help="an earlier --output to diff against")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = run(args.repeat, args.seed)
+    with open(args.output, "w") as destination:
+        json.dump(report, destination, indent=2)
+    print(f'Wrote "{args.output}"')
+
+    if args.compare:
+        with open(args.compare) as source:
+            changes = compare(json.load(source), report)
+        for change in changes:
+            print(f"CHANGED {change}")
+        if not changes:
+            print("no complexity changes")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("Aborted")
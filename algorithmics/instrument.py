@@ -0,0 +1,68 @@
+# operation counting for the chapter 1 algorithms
+#
+# the algorithms used to keep an `operations` local and logging.debug it, with
+# DEBUG switched on at import, so every call (and in russe/fib every loop
+# iteration) paid for formatting a log line even when nobody read it.
+#
+# now the algorithms count into plain int locals (about as cheap as python
+# gets) and hand them to `record` once, on the way out. `record` does nothing
+# unless a `collect()` block is active, so the cost when disabled is one
+# function call per algorithm call, nothing per iteration.
+#
+# >>> with collect() as stats:
+# ...     insert(list(V))
+# >>> stats.totals()["insert"]
+# Counter({'operations': 21, 'comparisons': 15, 'swaps': 15, 'iterations': 6})
+#
+# collect(every=100) keeps one call in 100, for profiling hot paths in production
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+
+class Collector:
+    def __init__(self, every: int = 1) -> None:
+        self.every = every
+        # calls seen per algorithm, including the ones the sampling skipped
+        self.seen: Counter = Counter()
+        # the counts of every kept call, per algorithm
+        self.calls: Dict[str, List[Dict[str, int]]] = defaultdict(list)
+
+    def add(self, name: str, counts: Dict[str, int]) -> None:
+        self.seen[name] += 1
+        if self.seen[name] % self.every == 0:
+            self.calls[name].append(counts)
+
+    def totals(self) -> Dict[str, Counter]:
+        """counts summed over the kept calls of each algorithm"""
+        totals: Dict[str, Counter] = {}
+        for name, calls in self.calls.items():
+            total: Counter = Counter()
+            for counts in calls:
+                total.update(counts)
+            totals[name] = total
+        return totals
+
+    def last(self, name: str) -> Dict[str, int]:
+        """counts of the most recent kept call of an algorithm"""
+        return self.calls[name][-1]
+
+
+_collector: Optional[Collector] = None
+
+
+def record(name: str, **counts: int) -> None:
+    """called once per algorithm call with that call's counters"""
+    if _collector is not None:
+        _collector.add(name, counts)
+
+
+@contextmanager
+def collect(every: int = 1) -> Iterator[Collector]:
+    """collect the counters of every algorithm called inside the block"""
+    global _collector
+    previous, _collector = _collector, Collector(every)
+    try:
+        yield _collector
+    finally:
+        _collector = previous
@@ -0,0 +1,179 @@
+# gcd beyond chapter1.gcd (trial division, O(min(m, n))) and chapter1.euclid
+# (one pair at a time):
+# - binary_gcd: Stein's algorithm, only shifts and subtractions
+# - extended_euclid: also gives the x, y with a*x + b*y = gcd(a, b)
+# - gcd_batch / lcm_batch: euclid over whole int64 numpy arrays at once
+# - shared_factors: Bernstein's product tree "batch gcd", the gcd of every
+#   number with the product of all the others, without trying every pair
+import math
+import random
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from chapter1 import euclid
+
+
+def binary_gcd(a: int, b: int) -> int:
+    """Stein's algorithm: strip the common factors of 2, then subtract"""
+    a, b = abs(a), abs(b)
+    if a == 0 or b == 0:
+        return a | b
+    # the power of 2 they share
+    shift = ((a | b) & -(a | b)).bit_length() - 1
+    a >>= (a & -a).bit_length() - 1
+    while b:
+        b >>= (b & -b).bit_length() - 1
+        # both odd now, their difference is even
+        if a > b:
+            a, b = b, a
+        b -= a
+    return a << shift
+
+
+def extended_euclid(a: int, b: int) -> Tuple[int, int, int]:
+    """(g, x, y) with a*x + b*y = g = gcd(a, b)"""
+    x0, y0, x1, y1 = 1, 0, 0, 1
+    while b:
+        q, r = divmod(a, b)
+        a, b = b, r
+        x0, x1 = x1, x0 - q * x1
+        y0, y1 = y1, y0 - q * y1
+    if a < 0:
+        return -a, -x0, -y0
+    return a, x0, y0
+
+
+def lcm(a: int, b: int) -> int:
+    if a == 0 or b == 0:
+        return 0
+    return abs(a // binary_gcd(a, b) * b)
+
+
+# =================================================================
+#	numpy batch
+# =================================================================
+
+def gcd_batch(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """elementwise gcd of two int64 arrays
+
+    euclid on every pair at once, only the pairs that aren't done yet are
+    carried into the next round so the work shrinks as they finish
+    """
+    a = np.abs(np.asarray(a, dtype=np.int64))
+    b = np.abs(np.asarray(b, dtype=np.int64))
+    a, b = np.broadcast_arrays(a, b)
+    out = a.copy()
+    active = np.flatnonzero(b)
+    x, y = a.ravel()[active], b.ravel()[active]
+    flat = out.reshape(-1)
+    while active.size:
+        x, y = y, x % y
+        done = y == 0
+        flat[active[done]] = x[done]
+        keep = ~done
+        active, x, y = active[keep], x[keep], y[keep]
+    return out
+
+
+def lcm_batch(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = np.abs(np.asarray(a, dtype=np.int64))
+    b = np.abs(np.asarray(b, dtype=np.int64))
+    g = gcd_batch(a, b)
+    # divide first so the product stays in range, 0 where either is 0
+    return np.where(g == 0, 0, a // np.where(g == 0, 1, g) * b)
+
+
+# =================================================================
+#	product tree batch gcd
+# =================================================================
+# 1. product tree: the leaves are the numbers, every node is the product of
+#    its two children, the root is P = the product of everything
+# 2. remainder tree: push P down the tree taking P mod node^2 at each level,
+#    at the leaves that is P mod n^2
+# 3. (P mod n^2) / n is (P / n) mod n, so gcd(n, that) is the gcd of n with
+#    the product of all the other numbers
+# O(n log^2 n) multiplications worth of work instead of n^2 pairwise gcds
+
+def product_tree(numbers: List[int]) -> List[List[int]]:
+    tree = [list(numbers)]
+    while len(tree[-1]) > 1:
+        level = tree[-1]
+        tree.append(
+            [level[i] * level[i + 1] for i in range(0, len(level) - 1, 2)]
+            + ([level[-1]] if len(level) % 2 else [])
+        )
+    return tree
+
+
+def shared_factors(numbers: List[int]) -> List[int]:
+    """gcd of each number with the product of all the others"""
+    if len(numbers) < 2:
+        return [1] * len(numbers)
+    tree = product_tree(numbers)
+    remainders = tree[-1]
+    for level in reversed(tree[:-1]):
+        remainders = [
+            remainders[i // 2] % (node * node) for i, node in enumerate(level)
+        ]
+    return [math.gcd(n, r // n) for n, r in zip(numbers, remainders)]
+
+
+# =================================================================
+#	cross check and throughput
+# =================================================================
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    pairs = [
+        (rng.randrange(-(2**62), 2**62), rng.randrange(2**62)) for _ in range(10_000)
+    ]
+    pairs += [(0, 0), (0, 5), (7, 0), (-12, 18), (2**62, 2**61)]
+    for a, b in pairs:
+        expected = math.gcd(a, b)
+        assert binary_gcd(a, b) == expected, (a, b)
+        g, x, y = extended_euclid(a, b)
+        assert g == expected and a * x + b * y == g, (a, b)
+    a = np.array([p[0] for p in pairs], dtype=np.int64)
+    b = np.array([p[1] for p in pairs], dtype=np.int64)
+    assert (gcd_batch(a, b) == np.gcd(a, b)).all()
+    small_a, small_b = a % 10**6, b % 10**6
+    assert (lcm_batch(small_a, small_b) == np.lcm(small_a, small_b)).all()
+
+    # products of two primes from a small pool, so plenty of them share one
+    primes = [p for p in range(10**4, 10**4 + 500) if all(p % q for q in range(2, 101))]
+    moduli = [rng.choice(primes) * rng.choice(primes) for _ in range(300)]
+    expected = [
+        math.gcd(m, math.prod(moduli[:i] + moduli[i + 1 :])) for i, m in enumerate(moduli)
+    ]
+    assert shared_factors(moduli) == expected
+    print("cross check against math.gcd ok")
+
+    n = 200_000
+    a = np.array([rng.randrange(2**62) for _ in range(n)], dtype=np.int64)
+    b = np.array([rng.randrange(2**62) for _ in range(n)], dtype=np.int64)
+    pairs = list(zip(a.tolist(), b.tolist()))
+    for label, run in (
+        ("math.gcd", lambda: [math.gcd(x, y) for x, y in pairs]),
+        ("euclid", lambda: [euclid(x, y) for x, y in pairs]),
+        ("binary_gcd", lambda: [binary_gcd(x, y) for x, y in pairs]),
+        ("gcd_batch", lambda: gcd_batch(a, b)),
+        ("np.gcd", lambda: np.gcd(a, b)),
+    ):
+        start = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start
+        print(f"{label:>12}: {n / seconds:14,.0f} pairs/s")
+
+    moduli = [rng.getrandbits(256) | 1 for _ in range(2_000)]
+    start = time.perf_counter()
+    shared_factors(moduli)
+    tree = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(len(moduli)):
+        for j in range(i + 1, len(moduli)):
+            math.gcd(moduli[i], moduli[j])
+    print(f"shared factors of {len(moduli)} 256 bit numbers:")
+    print(f"{'product tree':>12}: {tree:8.3f} s")
+    print(f"{'pairwise':>12}: {time.perf_counter() - start:8.3f} s")
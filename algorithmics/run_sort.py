@@ -0,0 +1,300 @@
+# an n log n sort to compare with the chapter 1 sorts, Timsort style:
+# 1. walk the list and find the natural runs (already sorted stretches,
+#    strictly descending ones are reversed in place)
+# 2. short runs are grown to `min_run` elements with insert (chapter 1)
+# 3. runs are merged pairwise, keeping the run lengths balanced on a stack
+#
+# the merge is leetcode/merge_sort.py's `bar`: the smaller run is copied out
+# and the other one is merged with it in place, from the back when the right
+# run is the copy (exactly bar) and from the front when the left one is.
+# when one side keeps winning the merge switches to "galloping": it searches
+# for where the other side's next element goes and moves the whole block at once
+#
+# operations are counted and recorded like insert/select so the numbers can be
+# compared directly (see instrument.py)
+import random
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+from chapter1 import insert_range, select
+from instrument import record
+
+# insertion sort wins below this many elements
+MIN_MERGE = 32
+# wins in a row before a merge starts galloping
+MIN_GALLOP = 7
+
+
+def min_run(n: int) -> int:
+    """a run length (16 to 32 for big n) that splits n into ~a power of 2 runs"""
+    r = 0
+    while n >= MIN_MERGE:
+        r |= n & 1
+        n >>= 1
+    return n + r
+
+
+def count_run(T: List[int], lo: int, hi: int) -> Tuple[int, int]:
+    """end of the run starting at lo and the operations it took"""
+    run_hi = lo + 1
+    if run_hi == hi:
+        return hi, 0
+    operations = 1
+    if T[run_hi] < T[lo]:
+        # strictly descending, reverse it (strict so equal elements keep order)
+        while run_hi + 1 < hi and T[run_hi + 1] < T[run_hi]:
+            run_hi += 1
+            operations += 1
+        T[lo : run_hi + 1] = T[lo : run_hi + 1][::-1]
+    else:
+        while run_hi + 1 < hi and not T[run_hi + 1] < T[run_hi]:
+            run_hi += 1
+            operations += 1
+    return run_hi + 1, operations
+
+
+# =================================================================
+#	galloping
+# =================================================================
+
+def gallop(a: List[int], x: int, lo: int, hi: int, right: bool) -> Tuple[int, int]:
+    """first idx in a[lo:hi] with a[idx] > x (right) or >= x, searching from lo
+
+    probes lo+1, lo+3, lo+7, ... then binary searches the last gap, so it is
+    cheap when the answer is close to lo
+    """
+    bound = 1
+    operations = 1
+    while lo + bound < hi and (
+        not x < a[lo + bound - 1] if right else a[lo + bound - 1] < x
+    ):
+        bound *= 2
+        operations += 1
+    search_lo, search_hi = lo + bound // 2, min(hi, lo + bound)
+    operations += (search_hi - search_lo).bit_length()
+    search = bisect_right if right else bisect_left
+    return search(a, x, search_lo, search_hi), operations
+
+
+def gallop_back(a: List[int], x: int, lo: int, hi: int, right: bool) -> Tuple[int, int]:
+    """same answer as gallop, searching from hi"""
+    bound = 1
+    operations = 1
+    while hi - bound > lo and (x < a[hi - bound] if right else not a[hi - bound] < x):
+        bound *= 2
+        operations += 1
+    search_lo, search_hi = max(lo, hi - bound), hi - bound // 2
+    operations += (search_hi - search_lo).bit_length()
+    search = bisect_right if right else bisect_left
+    return search(a, x, search_lo, search_hi), operations
+
+
+# =================================================================
+#	merging
+# =================================================================
+
+def merge(T: List[int], lo: int, mid: int, hi: int) -> int:
+    """merge the sorted runs T[lo:mid] and T[mid:hi] in place"""
+    # left elements already <= the first right element stay where they are,
+    # right elements already >= the last left element too
+    lo = bisect_right(T, T[mid], lo, mid)
+    hi = bisect_left(T, T[mid - 1], mid, hi)
+    operations = 2
+    if lo == mid or mid == hi:
+        return operations
+    if mid - lo <= hi - mid:
+        return operations + merge_lo(T, lo, mid, hi)
+    return operations + merge_hi(T, lo, mid, hi)
+
+
+def merge_lo(T: List[int], lo: int, mid: int, hi: int) -> int:
+    """copy out the left run and fill T from the front"""
+    left = T[lo:mid]
+    i, j, k = 0, mid, lo
+    n_left = len(left)
+    wins_left = wins_right = 0
+    operations = 0
+    while i < n_left and j < hi:
+        operations += 1
+        # ties go to the left run, that is what keeps the sort stable
+        if T[j] < left[i]:
+            T[k] = T[j]
+            j += 1
+            k += 1
+            wins_right, wins_left = wins_right + 1, 0
+            if wins_right >= MIN_GALLOP:
+                end, ops = gallop(T, left[i], j, hi, right=False)
+                T[k : k + end - j] = T[j:end]
+                k += end - j
+                j = end
+                operations += ops
+                wins_right = 0
+        else:
+            T[k] = left[i]
+            i += 1
+            k += 1
+            wins_left, wins_right = wins_left + 1, 0
+            if wins_left >= MIN_GALLOP and j < hi:
+                end, ops = gallop(left, T[j], i, n_left, right=True)
+                T[k : k + end - i] = left[i:end]
+                k += end - i
+                i = end
+                operations += ops
+                wins_left = 0
+    # whatever is left of the right run is already in place
+    T[k : k + n_left - i] = left[i:]
+    return operations
+
+
+def merge_hi(T: List[int], lo: int, mid: int, hi: int) -> int:
+    """copy out the right run and fill T from the back (merge_sort.bar)"""
+    right = T[mid:hi]
+    i, j, k = mid - 1, len(right) - 1, hi - 1
+    wins_left = wins_right = 0
+    operations = 0
+    while i >= lo and j >= 0:
+        operations += 1
+        # ties go to the right run, equal elements from the right stay last
+        if right[j] < T[i]:
+            T[k] = T[i]
+            i -= 1
+            k -= 1
+            wins_left, wins_right = wins_left + 1, 0
+            if wins_left >= MIN_GALLOP and i >= lo:
+                start, ops = gallop_back(T, right[j], lo, i + 1, right=True)
+                count = i + 1 - start
+                T[k - count + 1 : k + 1] = T[start : i + 1]
+                k -= count
+                i = start - 1
+                operations += ops
+                wins_left = 0
+        else:
+            T[k] = right[j]
+            j -= 1
+            k -= 1
+            wins_right, wins_left = wins_right + 1, 0
+            if wins_right >= MIN_GALLOP and j >= 0:
+                start, ops = gallop_back(right, T[i], 0, j + 1, right=False)
+                count = j + 1 - start
+                T[k - count + 1 : k + 1] = right[start : j + 1]
+                k -= count
+                j = start - 1
+                operations += ops
+                wins_right = 0
+    # whatever is left of the left run is already in place
+    T[lo : lo + j + 1] = right[: j + 1]
+    return operations
+
+
+# =================================================================
+#	the sort
+# =================================================================
+
+def _run_sort(T: List[int]) -> Tuple[List[int], int]:
+    n = len(T)
+    operations = 0
+    if n < 2:
+        return T, operations
+    minimum = min_run(n)
+    # (start, length) of the runs waiting to be merged
+    runs: List[Tuple[int, int]] = []
+    lo = 0
+    while lo < n:
+        hi, ops = count_run(T, lo, n)
+        operations += ops
+        if hi - lo < minimum:
+            hi = min(n, lo + minimum)
+            iterations, _, swaps = insert_range(T, lo, hi)
+            operations += iterations + swaps
+        runs.append((lo, hi - lo))
+        operations += merge_collapse(T, runs)
+        lo = hi
+
+    while len(runs) > 1:
+        operations += merge_at(T, runs, len(runs) - 2)
+    return T, operations
+
+
+def merge_collapse(T: List[int], runs: List[Tuple[int, int]]) -> int:
+    """merge until every run is longer than the two above it combined,
+    so the stack stays O(log n) deep and merges stay balanced"""
+    operations = 0
+    while len(runs) > 1:
+        n = len(runs) - 2
+        if (n > 0 and runs[n - 1][1] <= runs[n][1] + runs[n + 1][1]) or (
+            n > 1 and runs[n - 2][1] <= runs[n - 1][1] + runs[n][1]
+        ):
+            if runs[n - 1][1] < runs[n + 1][1]:
+                n -= 1
+        elif runs[n][1] > runs[n + 1][1]:
+            break
+        operations += merge_at(T, runs, n)
+    return operations
+
+
+def merge_at(T: List[int], runs: List[Tuple[int, int]], n: int) -> int:
+    """merge runs n and n + 1"""
+    (lo, left), (mid, right) = runs[n], runs[n + 1]
+    runs[n] = (lo, left + right)
+    del runs[n + 1]
+    return merge(T, lo, mid, mid + right)
+
+
+def run_sort(T: List[int]) -> List[int]:
+    """stable, O(n) on sorted input, O(n log n) worst case"""
+    T, operations = _run_sort(T)
+    record("run_sort", operations=operations)
+    return T
+
+
+def parallel_sort(T: List[int], workers: int = 4) -> List[int]:
+    """sort one chunk per worker process, then merge the chunks in place"""
+    n = len(T)
+    if workers < 2 or n < 2 * MIN_MERGE:
+        return run_sort(T)
+    size = -(-n // workers)
+    bounds = list(range(0, n, size)) + [n]
+    chunks = [T[lo:hi] for lo, hi in zip(bounds, bounds[1:])]
+    operations = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for lo, (chunk, ops) in zip(bounds, pool.map(_run_sort, chunks)):
+            T[lo : lo + len(chunk)] = chunk
+            operations += ops
+    # merge neighbouring chunks in rounds, like the bottom of a merge sort
+    while len(bounds) > 2:
+        merged = [bounds[0]]
+        for i in range(0, len(bounds) - 2, 2):
+            operations += merge(T, bounds[i], bounds[i + 1], bounds[i + 2])
+            merged.append(bounds[i + 2])
+        if len(bounds) % 2 == 0:
+            # odd number of chunks, the last one waits for the next round
+            merged.append(bounds[-1])
+        bounds = merged
+    record("parallel_sort", operations=operations)
+    return T
+
+
+# =================================================================
+#	compare with chapter 1
+# =================================================================
+# $ python run_sort.py 10000000
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(0)
+    data = [rng.randrange(n) for _ in range(n)]
+    expected = sorted(data)
+
+    sorts = [("run_sort", run_sort), ("parallel_sort", parallel_sort)]
+    if n <= 10_000:
+        # the quadratic sorts take forever past this
+        sorts.append(("select", select))
+    for label, sort in sorts:
+        start = time.perf_counter()
+        result = sort(list(data))
+        seconds = time.perf_counter() - start
+        assert result == expected, label
+        print(f"{label:>14}: {seconds:8.3f} s")
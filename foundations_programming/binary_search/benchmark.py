@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+
+"""
+Compare the search strategies in the `search` package on the IMDb names.
+
+Usage:
+$ python benchmark.py
+$ python benchmark.py -f sorted_names.txt -n 20 -a binary linear
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, Dict, List
+
+from search import binary, linear
+from search import random as random_search
+
+ALGORITHMS: Dict[str, Callable] = {
+    "binary": binary.find_index,
+    "linear": linear.find_index,
+    "random": random_search.find_index,
+}
+
+
+def load_names(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as source:
+        return source.read().splitlines()
+
+
+def queries(names: List[str], count: int, seed: int = 0) -> List[str]:
+    """half hits picked from the list, half misses that sort in between"""
+    rng = random.Random(seed)
+    hits = rng.sample(names, count // 2)
+    misses = [f"{name}~" for name in rng.sample(names, count - count // 2)]
+    return hits + misses
+
+
+def benchmark(find_index: Callable, names: List[str], values: List[str]) -> float:
+    """mean seconds per lookup"""
+    start = time.perf_counter()
+    for value in values:
+        find_index(names, value)
+    return (time.perf_counter() - start) / len(values)
+
+
+def main():
+    """Script entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-f", "--file", default="sorted_names.txt")
+    parser.add_argument("-n", "--queries", type=int, default=10)
+    parser.add_argument(
+        "-a", "--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS)
+    )
+    args = parser.parse_args()
+
+    names = load_names(args.file)
+    values = queries(names, args.queries)
+    print(f"{len(names):,} names, {len(values)} lookups")
+
+    for name in args.algorithms:
+        seconds = benchmark(ALGORITHMS[name], names, values)
+        print(f"{name:>8}: {seconds * 1e6:14,.1f} us/lookup")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("Aborted")
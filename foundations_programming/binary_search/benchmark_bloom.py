@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+
+"""
+Measure the bloom filter prefilter on a miss heavy lookup mix.
+
+Prints the false positive rate against memory for a few error rates, then
+times binary.find_index and MmapIndex.find_index with and without the filter.
+Without -f a synthetic sorted name file is used, so nothing is downloaded.
+
+Usage:
+$ python benchmark_bloom.py
+$ python benchmark_bloom.py -f sorted_names.txt -n 100000 --misses 0.9
+"""
+
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+from typing import Callable, List
+
+from search import binary
+from search.bloom import BloomFilter
+from search.mmap_index import MmapIndex
+
+ERROR_RATES = [0.1, 0.01, 0.001, 0.0001]
+
+
+def write_fixture(path: str, rows: int, seed: int = 0) -> None:
+    """sorted unique "First Last" names, like sorted_names.txt"""
+    rng = random.Random(seed)
+    letters = string.ascii_letters
+    names = {
+        "".join(rng.choices(letters, k=rng.randint(3, 10)))
+        + " "
+        + "".join(rng.choices(letters, k=rng.randint(3, 12)))
+        for _ in range(rows)
+    }
+    with open(path, "w", encoding="utf-8") as destination:
+        destination.writelines(f"{name}\n" for name in sorted(names))
+
+
+def queries(names: List[str], count: int, misses: float, seed: int = 0) -> List[str]:
+    """`misses` of them are not in names (but sort right next to one)"""
+    rng = random.Random(seed)
+    n_misses = int(count * misses)
+    values = rng.choices(names, k=count - n_misses)
+    values += [f"{name}~" for name in rng.choices(names, k=n_misses)]
+    rng.shuffle(values)
+    return values
+
+
+def benchmark(find_index: Callable[[str], object], values: List[str]) -> float:
+    """mean seconds per lookup"""
+    start = time.perf_counter()
+    for value in values:
+        find_index(value)
+    return (time.perf_counter() - start) / len(values)
+
+
+def main():
+    """Script entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-f", "--file", help="default: a synthetic sorted name file")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="synthetic names")
+    parser.add_argument("-n", "--queries", type=int, default=100_000)
+    parser.add_argument("--misses", type=float, default=0.9, help="share of misses")
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.file
+        if path is None:
+            path = os.path.join(directory, "sorted_names.txt")
+            write_fixture(path, args.rows)
+        with open(path, encoding="utf-8") as source:
+            names = source.read().splitlines()
+        values = queries(names, args.queries, args.misses)
+        misses = [f"{name}~" for name in random.Random(1).choices(names, k=args.queries)]
+        print(f"{len(names):,} names, {len(values):,} lookups, {args.misses:.0%} misses")
+
+        print("\nfalse positives vs memory")
+        for error_rate in ERROR_RATES:
+            bloom = BloomFilter(len(names), error_rate)
+            bloom.update(names)
+            measured = sum(value in bloom for value in misses) / len(misses)
+            print(
+                f"{error_rate:>8}: {bloom.bits / len(names):5.1f} bits/name, "
+                f"{bloom.nbytes / 2**20:7.2f} MB, {bloom.hashes:2d} hashes, "
+                f"false positives {measured:.4%} (expected {bloom.expected_error_rate():.4%})"
+            )
+
+        # the sidecar goes next to the text file, keep it out of the caller's dir
+        bloom_path = os.path.join(directory, "names.bloom")
+        start = time.perf_counter()
+        bloom = BloomFilter.for_file(path, args.error_rate, bloom_path)
+        print(f"\nbuilt {bloom_path} in {time.perf_counter() - start:.2f} s")
+        start = time.perf_counter()
+        BloomFilter.load(bloom_path).close()
+        print(f"loaded (mmap) in {(time.perf_counter() - start) * 1e3:.3f} ms")
+
+        index = MmapIndex(path, os.path.join(directory, "names.idx"))
+        filtered = MmapIndex(path, index.index_path, bloom=bloom)
+        assert all(
+            binary.find_index(names, value) == binary.find_index(names, value, bloom=bloom)
+            for value in values[:10_000]
+        )
+        for label, find_index in (
+            ("binary", lambda value: binary.find_index(names, value)),
+            ("binary + bloom", lambda value: binary.find_index(names, value, bloom=bloom)),
+            ("mmap", index.find_index),
+            ("mmap + bloom", filtered.find_index),
+        ):
+            seconds = benchmark(find_index, values)
+            print(f"{label:>16}: {seconds * 1e6:8.2f} us/lookup")
+        index.close()
+        filtered.close()
+        bloom.close()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("Aborted")
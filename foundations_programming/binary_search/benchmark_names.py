@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+"""
+Compare the single process names() generator with the parallel parser.
+
+Builds a synthetic name.basics.tsv.gz so nothing is downloaded.
+
+Usage:
+$ python benchmark_names.py
+$ python benchmark_names.py --rows 2000000 --workers 1 2 4 8
+"""
+
+import argparse
+import gzip
+import os
+import random
+import string
+import tempfile
+import time
+
+from download_imdb import names
+
+HEADER = "nconst\tprimaryName\tbirthYear\tdeathYear\tprimaryProfession\tknownForTitles\n"
+
+
+def write_fixture(path: str, rows: int, seed: int = 0) -> None:
+    """gzip TSV shaped like the IMDb dump"""
+    rng = random.Random(seed)
+    letters = string.ascii_letters
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=1) as tsv:
+        tsv.write(HEADER)
+        for i in range(rows):
+            first = "".join(rng.choices(letters, k=rng.randint(3, 10)))
+            last = "".join(rng.choices(letters, k=rng.randint(3, 12)))
+            tsv.write(f"nm{i:07d}\t{first} {last}\t1970\t\\N\tactor\ttt0000001\n")
+
+
+def benchmark(path: str, workers: int, ordered: bool) -> float:
+    start = time.perf_counter()
+    for _ in names(path, workers=workers, ordered=ordered):
+        pass
+    return time.perf_counter() - start
+
+
+def main():
+    """Script entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, os.cpu_count() or 1]
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "name.basics.tsv.gz")
+        write_fixture(path, args.rows)
+        print(f"{args.rows:,} rows")
+
+        baseline = benchmark(path, 1, True)
+        print(f"{'generator':>20}: {baseline:8.2f} s")
+        for workers in sorted(set(args.workers) - {1}):
+            for ordered in (True, False):
+                seconds = benchmark(path, workers, ordered)
+                label = f"{workers} workers {'ordered' if ordered else 'unordered'}"
+                print(f"{label:>20}: {seconds:8.2f} s ({baseline / seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("Aborted")
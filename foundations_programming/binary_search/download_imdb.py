@@ -1,54 +1,249 @@
 #!/usr/bin/env python
 
-# copy/paste from: https://github.com/realpython/materials/blob/master/binary-search/download_imdb.py 
+# copy/paste from: https://github.com/realpython/materials/blob/master/binary-search/download_imdb.py
 
 """
 Fetch and parse people names from the IMDb.
 
 Usage:
 $ python download_imdb.py
+$ python download_imdb.py --source name.basics.tsv.gz --run-size 64
+$ python download_imdb.py --workers 4
 """
 
+import argparse
 import csv
 import gzip
-import shutil
+import heapq
+import io
+import os
+import sys
 import tempfile
 import urllib.request
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
+from typing import BinaryIO, Iterable, Iterator, List, TextIO
+
+URL = "https://datasets.imdbws.com/name.basics.tsv.gz"
+
+# NOTE: the original version copied the whole archive to a temp file, then
+# read names.txt back with readlines() and sorted() it, so peak memory was a
+# few times the size of the dump. now everything streams:
+#   response -> gunzip -> csv -> names.txt
+#                              -> sorted runs on disk -> k-way merge -> sorted_names.txt
+# and memory is bounded by --run-size, not by the size of the IMDb dump
 
 
 def main():
     """Script entry point."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--source", default=URL, help="url (http/https/file) or local path"
+    )
+    parser.add_argument(
+        "--run-size",
+        type=int,
+        default=256,
+        help="MB of memory a run of names (the str objects and the list) may "
+        "take before it is sorted and spilled to disk",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="processes used to parse the TSV, 0 means one per cpu",
+    )
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count()
 
-    print("Fetching data from IMDb...")
+    print(f"Fetching data from {args.source}...")
 
-    with open("names.txt", "w", encoding="utf-8") as destination:
-        destination.writelines(names())
-
-    with open("names.txt", encoding="utf-8") as source, open(
+    with open("names.txt", "w", encoding="utf-8") as unsorted, open(
         "sorted_names.txt", "w", encoding="utf-8"
     ) as destination:
-        destination.writelines(sorted(source.readlines()))
+        lines = names(args.source, workers=workers)
+        external_sort(tee(lines, unsorted), destination, args.run_size)
 
     print('Created "names.txt" and "sorted_names.txt"')
 
 
-def names():
+def open_source(source: str) -> BinaryIO:
+    """a local file is opened directly, anything else goes through urllib"""
+    if os.path.exists(source):
+        return open(source, "rb")
+    return urllib.request.urlopen(source)
+
+
+def names(
+    source: str = URL,
+    workers: int = 1,
+    ordered: bool = True,
+    chunk_size: int = 4 * 1024 * 1024,
+) -> Iterator[str]:
     """Return a generator of names with a trailing newline."""
-    url = "https://datasets.imdbws.com/name.basics.tsv.gz"
-    with urllib.request.urlopen(url) as response:
-        with tempfile.NamedTemporaryFile(mode="w+b") as archive:
-            shutil.copyfileobj(response, archive)
-            archive.seek(0)
-            with gzip.open(archive, mode="rt", encoding="utf-8") as tsv_file:
-                tsv = csv.reader(tsv_file, delimiter="\t")
-                next(tsv)  # Skip the header
-                for record in tsv:
-                    full_name = record[1]
-                    yield f"{full_name}\n"
+    if workers > 1:
+        for block in parallel_names(source, workers, ordered, chunk_size):
+            yield from io.StringIO(block)
+        return
+
+    with open_source(source) as response:
+        # gzip decompresses as the response is read, nothing is buffered to disk
+        with gzip.open(response, mode="rt", encoding="utf-8") as tsv_file:
+            tsv = csv.reader(tsv_file, delimiter="\t")
+            next(tsv)  # Skip the header
+            for record in tsv:
+                full_name = record[1]
+                yield f"{full_name}\n"
+
+
+# =================================================================
+#	parallel parsing
+# =================================================================
+# csv.reader is one record at a time on one core, and on the full dump that is
+# the bottleneck. instead the decompressed bytes are cut into newline aligned
+# chunks and a pool pulls the name column out of a whole chunk at once
+
+def chunks(stream: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+    """blocks of ~chunk_size bytes that always end on a newline"""
+    tail = b""
+    while True:
+        block = stream.read(chunk_size)
+        if not block:
+            break
+        block = tail + block
+        cut = block.rfind(b"\n") + 1
+        if cut == 0:
+            # a single line longer than chunk_size, keep reading
+            tail = block
+            continue
+        tail = block[cut:]
+        yield block[:cut]
+    if tail:
+        yield tail + b"\n"
+
+
+def extract_names(chunk: bytes) -> str:
+    """the name column of every line in chunk, one per line"""
+    if b'"' in chunk:
+        # quoted fields are rare, let csv deal with them so the output matches
+        # the single process version exactly
+        text = io.StringIO(chunk.decode("utf-8"), newline="")
+        return "".join(f"{record[1]}\n" for record in csv.reader(text, delimiter="\t"))
+    # chunks always end on a newline so the last split is empty
+    lines = chunk.decode("utf-8").split("\n")[:-1]
+    return "".join([line.split("\t", 2)[1] + "\n" for line in lines])
+
+
+def parallel_names(
+    source: str, workers: int, ordered: bool = True, chunk_size: int = 4 * 1024 * 1024
+) -> Iterator[str]:
+    """blocks of names parsed by a pool of workers
+
+    ordered=False hands blocks back as soon as they are done, which keeps the
+    pool busy when one chunk is slow, names.txt is then not in the dump order
+    """
+    # only a couple of chunks per worker are in flight so memory stays bounded
+    in_flight = 2 * workers
+    with open_source(source) as response, gzip.open(response) as stream:
+        stream.readline()  # Skip the header
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending: deque = deque()
+            for chunk in chunks(stream, chunk_size):
+                pending.append(pool.submit(extract_names, chunk))
+                if len(pending) >= in_flight:
+                    yield from _drain(pending, ordered, keep=workers)
+            yield from _drain(pending, ordered, keep=0)
+
+
+def _drain(pending: deque, ordered: bool, keep: int) -> Iterator[str]:
+    """pop finished blocks until only `keep` futures are left"""
+    if ordered:
+        while len(pending) > keep:
+            yield pending.popleft().result()
+        return
+    for future in as_completed(list(pending)):
+        if len(pending) <= keep:
+            break
+        pending.remove(future)
+        yield future.result()
+
+
+def tee(lines: Iterable[str], destination: TextIO) -> Iterator[str]:
+    """write every line to destination on the way through"""
+    for line in lines:
+        destination.write(line)
+        yield line
+
+
+# =================================================================
+#	external merge sort
+# =================================================================
+
+def sorted_runs(
+    lines: Iterable[str], run_size: int, directory: str
+) -> Iterator[str]:
+    """sort runs taking ~run_size MB of memory and spill each one to a file"""
+    limit = run_size * 1024 * 1024
+    run: List[str] = []
+    size = 0
+    for line in lines:
+        run.append(line)
+        # what the run really holds: the str object (~50 bytes of header
+        # before the text, 4-5x the text for a short name) plus its list slot
+        size += sys.getsizeof(line) + 8
+        if size >= limit:
+            yield spill(run, directory)
+            run, size = [], 0
+    if run:
+        yield spill(run, directory)
+
+
+def spill(run: List[str], directory: str) -> str:
+    run.sort()
+    with tempfile.NamedTemporaryFile(
+        mode="w", encoding="utf-8", dir=directory, suffix=".run", delete=False
+    ) as destination:
+        destination.writelines(run)
+    return destination.name
+
+
+def external_sort(
+    lines: Iterable[str], destination: TextIO, run_size: int = 256, fan_in: int = 64
+) -> None:
+    """sort lines into destination holding at most ~run_size MB at once"""
+    with tempfile.TemporaryDirectory() as directory:
+        runs = list(sorted_runs(lines, run_size, directory))
+        # too many runs means too many open files, merge them in passes
+        while len(runs) > fan_in:
+            runs = [
+                merge_to_file(runs[i : i + fan_in], directory)
+                for i in range(0, len(runs), fan_in)
+            ]
+        merge(runs, destination)
+
+
+def merge(runs: List[str], destination: TextIO) -> None:
+    """k-way heap merge, only one line per run is held in memory"""
+    with ExitStack() as stack:
+        sources = [
+            stack.enter_context(open(run, encoding="utf-8")) for run in runs
+        ]
+        destination.writelines(heapq.merge(*sources))
+
+
+def merge_to_file(runs: List[str], directory: str) -> str:
+    with tempfile.NamedTemporaryFile(
+        mode="w", encoding="utf-8", dir=directory, suffix=".run", delete=False
+    ) as destination:
+        merge(runs, destination)
+    for run in runs:
+        os.remove(run)
+    return destination.name
 
 
 if __name__ == "__main__":
     try:
         main()
     except KeyboardInterrupt:
-        print("Aborted")
\ No newline at end of file
+        print("Aborted")
@@ -1,5 +1,5 @@
 # https://www.python.org/dev/peps/pep-0484/#user-defined-generic-types
-from typing import TypeVar
+from typing import TypeVar, Union
 
 T = TypeVar("T")
 S = TypeVar("S")
@@ -7,4 +7,9 @@ S = TypeVar("S")
 # in the tutorial there is an "identity function"
 # i believe it is used primarily as another form of typing
 # where the identity function is as the 'key' function 
-# that extracts and returns an element from several different types
\ No newline at end of file
+# that extracts and returns an element from several different types
+
+
+def identity(element: T) -> Union[T, S]:
+    """default 'key' function, the element is its own search key"""
+    return element
@@ -0,0 +1,147 @@
+from typing import Callable, Container, Optional, Sequence
+
+from search import T, S, identity
+
+# NOTE: elements must already be sorted by key(element)
+# every query below is built on two bounds, each one halves the window per
+# step so they are O(log n) and only ever keep two ints around (no copies,
+# no sets of visited indices like the random strategy)
+#
+#   lower_bound -> first idx where key(elements[idx]) >= value
+#   upper_bound -> first idx where key(elements[idx]) > value
+#
+# so the matches for value always live in range(lower_bound, upper_bound)
+
+
+def lower_bound(
+    elements: Sequence[T], value: S, key: Callable[[T], S] = identity
+) -> int:
+    """first index whose key is >= value (len(elements) if there is none)"""
+    left, right = 0, len(elements)
+    while left < right:
+        middle = (left + right) // 2
+        if key(elements[middle]) < value:
+            left = middle + 1
+        else:
+            right = middle
+    return left
+
+
+def upper_bound(
+    elements: Sequence[T], value: S, key: Callable[[T], S] = identity
+) -> int:
+    """first index whose key is > value (len(elements) if there is none)"""
+    left, right = 0, len(elements)
+    while left < right:
+        middle = (left + right) // 2
+        if value < key(elements[middle]):
+            right = middle
+        else:
+            left = middle + 1
+    return left
+
+
+# =================================================================
+#	index queries
+# =================================================================
+
+def find_index(
+    elements: Sequence[T],
+    value: S,
+    key: Callable[[T], S] = identity,
+    bloom: Optional[Container[S]] = None,
+) -> Optional[int]:
+    """index of *a* match, stops as soon as the middle element hits
+
+    bloom: the keys of elements in a set that may have false positives
+    (search/bloom.py), a value it doesn't contain is a miss without searching
+    """
+    if bloom is not None and value not in bloom:
+        return None
+    left, right = 0, len(elements) - 1
+    while left <= right:
+        middle = (left + right) // 2
+        middle_key = key(elements[middle])
+        if middle_key == value:
+            return middle
+        if middle_key < value:
+            left = middle + 1
+        else:
+            right = middle - 1
+    return None
+
+
+def find_leftmost_index(
+    elements: Sequence[T], value: S, key: Callable[[T], S] = identity
+) -> Optional[int]:
+    """index of the first match when value is duplicated"""
+    idx = lower_bound(elements, value, key)
+    if idx < len(elements) and key(elements[idx]) == value:
+        return idx
+    return None
+
+
+def find_rightmost_index(
+    elements: Sequence[T], value: S, key: Callable[[T], S] = identity
+) -> Optional[int]:
+    """index of the last match when value is duplicated"""
+    idx = upper_bound(elements, value, key) - 1
+    if idx >= 0 and key(elements[idx]) == value:
+        return idx
+    return None
+
+
+def find_all_indices(
+    elements: Sequence[T], value: S, key: Callable[[T], S] = identity
+) -> range:
+    """every index matching value, empty range if there are none"""
+    return range(
+        lower_bound(elements, value, key), upper_bound(elements, value, key)
+    )
+
+
+def find_range(
+    elements: Sequence[T], lower: S, upper: S, key: Callable[[T], S] = identity
+) -> range:
+    """every index where lower <= key(element) <= upper"""
+    start = lower_bound(elements, lower, key)
+    stop = upper_bound(elements, upper, key)
+    return range(start, max(start, stop))
+
+
+def contains(
+    elements: Sequence[T],
+    value: S,
+    key: Callable[[T], S] = identity,
+    bloom: Optional[Container[S]] = None,
+) -> bool:
+    return find_index(elements, value, key, bloom) is not None
+
+
+# =================================================================
+#	element queries
+# =================================================================
+# same as above, return the element instead of WHERE it is
+
+def find(
+    elements: Sequence[T],
+    value: S,
+    key: Callable[[T], S] = identity,
+    bloom: Optional[Container[S]] = None,
+) -> Optional[T]:
+    idx = find_index(elements, value, key, bloom)
+    return elements[idx] if idx is not None else None
+
+
+def find_leftmost(
+    elements: Sequence[T], value: S, key: Callable[[T], S] = identity
+) -> Optional[T]:
+    idx = find_leftmost_index(elements, value, key)
+    return elements[idx] if idx is not None else None
+
+
+def find_rightmost(
+    elements: Sequence[T], value: S, key: Callable[[T], S] = identity
+) -> Optional[T]:
+    idx = find_rightmost_index(elements, value, key)
+    return elements[idx] if idx is not None else None
@@ -0,0 +1,188 @@
+import math
+import mmap
+import os
+import struct
+from hashlib import blake2b
+from typing import Iterable, Optional, Tuple, Union
+
+# most lookups on the name set are misses, and a miss costs a full binary
+# search (or a full scan for linear). a bloom filter answers "definitely not
+# there" from a few bits:
+#
+# - m bits, all 0. adding a value sets the k bits its hashes point at
+# - a value is "maybe there" only if all k of its bits are set, a value that
+#   was added always is (no false negatives), one that wasn't usually isn't
+# - for n values and a false positive rate p the best sizes are
+#     m = -n ln p / (ln 2)^2 bits  (~9.6 bits per value at 1%)
+#     k = m / n ln 2 hashes        (7 at 1%)
+#
+# the k positions come from one blake2b digest split into two 64 bit halves,
+# h1 + i * h2 (Kirsch-Mitzenmacher double hashing), so a lookup hashes once.
+# blake2b rather than hash(): str hashes change between processes and the
+# filter is saved to disk
+#
+# saved like the MmapIndex sidecar: a header then the raw bits, and loaded
+# with a read only mmap so the os page cache holds the bits
+#
+#   with BloomFilter.for_file("sorted_names.txt") as bloom:
+#       binary.find_index(names, "No Such Name", bloom=bloom)
+
+MAGIC = b"NAMEBLM1"
+# magic, size of the text file, mtime of the text file (both 0 when not built
+# from a file), number of values, number of bits, number of hashes
+HEADER = struct.Struct("<8sQQQQQ")
+# the 16 byte digest as the two 64 bit hashes
+_DIGEST = struct.Struct("<QQ")
+
+Value = Union[str, bytes]
+
+
+def _encode(value: Value) -> bytes:
+    return value.encode("utf-8") if isinstance(value, str) else value
+
+
+def optimal_bits(capacity: int, error_rate: float) -> int:
+    return max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+
+
+def optimal_hashes(capacity: int, bits: int) -> int:
+    return max(1, round(bits / max(1, capacity) * math.log(2)))
+
+
+class BloomFilter:
+    """set membership that can be wrong about a miss (at error_rate), never about a hit
+
+    >>> bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    >>> bloom.add("Arnold Schwarzenegger")
+    >>> "Arnold Schwarzenegger" in bloom, "No Such Name" in bloom
+    (True, False)
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.bits = optimal_bits(capacity, error_rate)
+        self.hashes = optimal_hashes(capacity, self.bits)
+        self.count = 0
+        self._array: Union[bytearray, memoryview] = bytearray((self.bits + 7) // 8)
+        self._map: Optional[mmap.mmap] = None
+        # the text file this was built from, see for_file
+        self._source = (0, 0)
+
+    def _hash(self, value: Value) -> Tuple[int, int]:
+        h1, h2 = _DIGEST.unpack(blake2b(_encode(value), digest_size=16).digest())
+        # odd, so the k positions can't all collapse onto one
+        return h1, h2 | 1
+
+    def add(self, value: Value) -> None:
+        if self._map is not None:
+            raise TypeError("a loaded filter is read only")
+        h1, h2 = self._hash(value)
+        bits, array = self.bits, self._array
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % bits
+            array[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def update(self, values: Iterable[Value]) -> None:
+        for value in values:
+            self.add(value)
+
+    def __contains__(self, value: Value) -> bool:
+        h1, h2 = self._hash(value)
+        bits, array = self.bits, self._array
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % bits
+            if not array[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._array)
+
+    def expected_error_rate(self) -> float:
+        """(1 - e^(-kn/m))^k for the values actually added"""
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+    # -----------------------------------------------------------------
+    #	on disk
+    # -----------------------------------------------------------------
+    def save(self, path: str) -> None:
+        size, mtime_ns = self._source
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as destination:
+            destination.write(
+                HEADER.pack(MAGIC, size, mtime_ns, self.count, self.bits, self.hashes)
+            )
+            destination.write(self._array)
+        # rename so a concurrent reader never sees half a filter
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        """mmap a saved filter read only, the bits are not copied"""
+        with open(path, "rb") as source:
+            mapped = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, size, mtime_ns, count, bits, hashes = HEADER.unpack_from(mapped)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a saved BloomFilter")
+            # a truncated file would only fail later, on some lookup
+            if len(mapped) < HEADER.size + (bits + 7) // 8:
+                raise ValueError(f"{path} is truncated")
+        except (ValueError, struct.error):
+            mapped.close()
+            raise
+        bloom = cls.__new__(cls)
+        bloom.bits, bloom.hashes, bloom.count = bits, hashes, count
+        bloom._map = mapped
+        bloom._array = memoryview(mapped)[HEADER.size :]
+        bloom._source = (size, mtime_ns)
+        return bloom
+
+    @classmethod
+    def for_file(
+        cls, path: str, error_rate: float = 0.01, bloom_path: Optional[str] = None
+    ) -> "BloomFilter":
+        """filter of every line of path (names.txt, sorted_names.txt)
+
+        kept in a sidecar (path + ".bloom") that is rebuilt when the text file
+        changes size or mtime, or when a lower error_rate is asked for
+        """
+        bloom_path = bloom_path or f"{path}.bloom"
+        stat = os.stat(path)
+        try:
+            bloom = cls.load(bloom_path)
+        except (FileNotFoundError, ValueError, struct.error):
+            bloom = None
+        if bloom is not None:
+            if bloom._source == (stat.st_size, stat.st_mtime_ns) and (
+                bloom.bits >= optimal_bits(bloom.count, error_rate)
+            ):
+                return bloom
+            bloom.close()
+
+        with open(path, "rb") as source:
+            capacity = sum(1 for _ in source)
+        bloom = cls(capacity, error_rate)
+        with open(path, encoding="utf-8") as source:
+            bloom.update(line.rstrip("\n") for line in source)
+        bloom._source = (stat.st_size, stat.st_mtime_ns)
+        bloom.save(bloom_path)
+        return cls.load(bloom_path)
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._array.release()
+            self._map.close()
+            self._map = None
+
+    def __enter__(self) -> "BloomFilter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
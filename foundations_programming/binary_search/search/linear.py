@@ -0,0 +1,28 @@
+from typing import Callable, Container, Optional, Sequence
+
+from search import T, S, identity
+
+# brute force baseline: touch every element until a match, O(n)
+# a miss touches all n, unless a bloom filter (search/bloom.py) rules it out
+
+def find_index(
+    elements: Sequence[T],
+    value: S,
+    key: Callable[[T], S] = identity,
+    bloom: Optional[Container[S]] = None,
+) -> Optional[int]:
+    if bloom is not None and value not in bloom:
+        return None
+    for idx, element in enumerate(elements):
+        if key(element) == value:
+            return idx
+    return None
+
+def find(
+    elements: Sequence[T],
+    value: S,
+    key: Callable[[T], S] = identity,
+    bloom: Optional[Container[S]] = None,
+) -> Optional[T]:
+    idx = find_index(elements, value, key, bloom)
+    return elements[idx] if idx is not None else None
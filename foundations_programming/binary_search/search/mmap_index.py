@@ -0,0 +1,211 @@
+import mmap
+import os
+import struct
+from array import array
+from typing import Container, Iterator, Optional, Union
+
+# binary search straight off the sorted file on disk instead of a list of str
+#
+# - the text file is mmap'd read only, so the os page cache holds the data
+#   and every process searching the same file shares those pages
+# - the start of every line is kept in a compact array of 8 byte offsets,
+#   that array is written next to the text file (the "sidecar") and is also
+#   mmap'd, so a cold process doesn't have to rescan the text
+# - lookups binary search over the offsets and only decode the lines they touch
+#
+# NOTE: comparing the raw utf-8 bytes gives the same order as comparing the str
+# (utf-8 preserves code point order) so sorted_names.txt can be used as is
+
+MAGIC = b"NAMEIDX1"
+# magic, size of the text file, mtime of the text file, number of lines
+HEADER = struct.Struct("<8sQQQ")
+# the byte 0xff never shows up in utf-8, so prefix + 0xff sorts after every
+# line that starts with prefix
+PREFIX_END = b"\xff"
+
+Value = Union[str, bytes]
+
+
+def _encode(value: Value) -> bytes:
+    return value.encode("utf-8") if isinstance(value, str) else value
+
+
+def build_offsets(path: str) -> array:
+    """line start offsets, plus one sentinel so line i is offsets[i]:offsets[i+1]"""
+    offsets = array("Q")
+    position = 0
+    with open(path, "rb") as source:
+        for line in source:
+            offsets.append(position)
+            position += len(line)
+            last = line
+    if offsets and not last.endswith(b"\n"):
+        # pretend the missing newline is there so every line drops its last byte
+        position += 1
+    offsets.append(position)
+    return offsets
+
+
+def write_index(path: str, index_path: str) -> None:
+    """build the offsets for path and save them to index_path"""
+    stat = os.stat(path)
+    offsets = build_offsets(path)
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, "wb") as destination:
+        destination.write(
+            HEADER.pack(MAGIC, stat.st_size, stat.st_mtime_ns, len(offsets) - 1)
+        )
+        offsets.tofile(destination)
+    # rename so a concurrent reader never sees half an index
+    os.replace(tmp_path, index_path)
+
+
+def _map(path: str) -> Optional[mmap.mmap]:
+    """read only mmap of path, None for an empty file (those can't be mapped)"""
+    with open(path, "rb") as source:
+        if os.fstat(source.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class MmapIndex:
+    """sorted text file, one element per line, searchable without loading it
+
+    >>> with MmapIndex("sorted_names.txt") as names:
+    ...     names.find("Arnold Schwarzenegger")
+    """
+
+    def __init__(
+        self,
+        path: str,
+        index_path: Optional[str] = None,
+        bloom: Optional[Container[Value]] = None,
+    ) -> None:
+        self.path = path
+        # e.g. BloomFilter.for_file(path), misses it rules out skip the search
+        self.bloom = bloom
+        self.index_path = index_path or f"{path}.idx"
+        if not self._index_is_fresh():
+            write_index(self.path, self.index_path)
+
+        self._text = _map(self.path)
+        self._index = _map(self.index_path)
+        _, _, _, count = HEADER.unpack_from(self._index)
+        self._offsets = memoryview(self._index)[HEADER.size :].cast("Q")
+        self._count = count
+
+    def _index_is_fresh(self) -> bool:
+        """sidecar exists and was built from the current version of the text"""
+        try:
+            with open(self.index_path, "rb") as source:
+                header = source.read(HEADER.size)
+        except FileNotFoundError:
+            return False
+        if len(header) != HEADER.size:
+            return False
+        magic, size, mtime_ns, _ = HEADER.unpack(header)
+        stat = os.stat(self.path)
+        return (
+            magic == MAGIC and size == stat.st_size and mtime_ns == stat.st_mtime_ns
+        )
+
+    # -----------------------------------------------------------------
+    #	sequence protocol
+    # -----------------------------------------------------------------
+    def __len__(self) -> int:
+        return self._count
+
+    def line_bytes(self, idx: int) -> bytes:
+        """raw line without the trailing newline"""
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError("index out of range")
+        return self._text[self._offsets[idx] : self._offsets[idx + 1] - 1]
+
+    def __getitem__(self, idx: int) -> str:
+        return self.line_bytes(idx).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        return self.iter_range(range(self._count))
+
+    def __contains__(self, value: Value) -> bool:
+        return self.find_index(value) is not None
+
+    # -----------------------------------------------------------------
+    #	binary search over the offsets
+    # -----------------------------------------------------------------
+    def lower_bound(self, value: Value) -> int:
+        """first index whose line is >= value"""
+        value = _encode(value)
+        text, offsets = self._text, self._offsets
+        left, right = 0, self._count
+        while left < right:
+            middle = (left + right) // 2
+            if text[offsets[middle] : offsets[middle + 1] - 1] < value:
+                left = middle + 1
+            else:
+                right = middle
+        return left
+
+    def upper_bound(self, value: Value) -> int:
+        """first index whose line is > value"""
+        value = _encode(value)
+        text, offsets = self._text, self._offsets
+        left, right = 0, self._count
+        while left < right:
+            middle = (left + right) // 2
+            if value < text[offsets[middle] : offsets[middle + 1] - 1]:
+                right = middle
+            else:
+                left = middle + 1
+        return left
+
+    def find_index(self, value: Value) -> Optional[int]:
+        """index of the leftmost line equal to value"""
+        value = _encode(value)
+        if self.bloom is not None and value not in self.bloom:
+            return None
+        idx = self.lower_bound(value)
+        if idx < self._count and self.line_bytes(idx) == value:
+            return idx
+        return None
+
+    def find(self, value: Value) -> Optional[str]:
+        idx = self.find_index(value)
+        return self[idx] if idx is not None else None
+
+    def prefix_range(self, prefix: Value) -> range:
+        """indices of every line starting with prefix"""
+        prefix = _encode(prefix)
+        return range(self.lower_bound(prefix), self.lower_bound(prefix + PREFIX_END))
+
+    def value_range(self, lower: Value, upper: Value) -> range:
+        """indices of every line where lower <= line <= upper"""
+        start = self.lower_bound(lower)
+        return range(start, max(start, self.upper_bound(upper)))
+
+    def iter_range(self, indices: range) -> Iterator[str]:
+        for idx in indices:
+            yield self[idx]
+
+    def prefix(self, prefix: Value) -> Iterator[str]:
+        return self.iter_range(self.prefix_range(prefix))
+
+    def between(self, lower: Value, upper: Value) -> Iterator[str]:
+        return self.iter_range(self.value_range(lower, upper))
+
+    # -----------------------------------------------------------------
+    #	cleanup
+    # -----------------------------------------------------------------
+    def close(self) -> None:
+        self._offsets.release()
+        self._index.close()
+        if self._text is not None:
+            self._text.close()
+
+    def __enter__(self) -> "MmapIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
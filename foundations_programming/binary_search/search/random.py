@@ -6,23 +6,24 @@ from search import T, S
 # NOTE: since value doesn't *have* to be an element in sequence
 # i.e. the original code uses elements: Sequence[T], value: S
 
+# NOTE: this used to be n_elements = len(set(elements))
+# which copies the whole sequence on every call (O(n) time and memory)
+# and with duplicates the tail of the sequence could never be picked
+
 def find_index(elements: Sequence[T], value: S) -> Optional[int]:
     checked = set()
-    n_elements = len(set(elements))
-    while True:
+    n_elements = len(elements)
+    while len(checked) < n_elements:
         # randomly select an element from a sequence
-        idx = random.choice(range(n_elements))
+        idx = random.randrange(n_elements)
         # keep track of all elements selected
         checked.add(idx)
         # see if the element selected matches the user search value
         if elements[idx] == value:
             return idx
-
-        checked.add(idx)
-        if len(checked) == n_elements:
-            # if all selected stop
-            return None
+    # all indices selected and no match
+    return None
 
 def find(elements: Sequence[T], value: S) -> Optional[T]:
     idx = find_index(elements, value)
-    return elements[idx] if idx is not None else None
\ No newline at end of file
+    return elements[idx] if idx is not None else None
@@ -1,6 +1,8 @@
 from typing import NamedTuple
 from collections import Counter, defaultdict
 
+from subsequence import SubsequenceIndex
+
 # https://techdevguide.withgoogle.com/paths/foundational/find-longest-word-in-dictionary-that-subsequence-of-given-string/#!
 S = "abppplee"
 D = ["able", "ale", "apple", "bale", "kangaroo"]
@@ -47,6 +49,13 @@ for word in D:
 
     # NOTE: this should ultimately grab the longest word
 
+# NOTE: idx only keeps the first position of each letter, so the order check
+# is wrong as soon as a word needs a later copy of a letter (apple needs the
+# 2nd p after the 1st). subsequence.py keeps every position and bisects them,
+# and longest_match tries the longest words first
+print(f"longest: {SubsequenceIndex(S).longest_match(D)}")
+# longest: apple
+
 
 
 # =================================================================
@@ -0,0 +1,205 @@
+import argparse
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# problem 1 (item1.py): the longest word in D that is a subsequence of S
+#
+# item1.py only kept the *first* index of each letter, so a word that needs
+# a later copy of a letter ("apple" needs the 2nd p) is judged wrong. the
+# fix is to remember every position of every letter:
+#
+#   positions["p"] = [2, 3, 4]
+#
+# and match a word greedily: each letter takes the first position after the
+# one the previous letter used. a bisect finds that position, so a word costs
+# O(|w| log |S|) no matter how long S is.
+#
+# with table=True it also builds a next-occurrence table, nxt[c][i] is the
+# first position >= i holding c, which makes every step a lookup, O(|w|), for
+# |alphabet| * |S| ints of memory
+
+
+class SubsequenceIndex:
+    def __init__(self, S: str, table: bool = False) -> None:
+        self.S = S
+        self.positions: Dict[str, List[int]] = defaultdict(list)
+        for n, letter in enumerate(S):
+            self.positions[letter].append(n)
+        self.positions = dict(self.positions)
+
+        self.next: Optional[Dict[str, array]] = None
+        if table:
+            self.next = {}
+            end = len(S)
+            for letter, where in self.positions.items():
+                # len(S) means "not found"
+                column = array("i", [end]) * (end + 1)
+                nxt = end
+                k = len(where) - 1
+                for i in range(end - 1, -1, -1):
+                    if k >= 0 and where[k] == i:
+                        nxt = i
+                        k -= 1
+                    column[i] = nxt
+                self.next[letter] = column
+
+    def is_subsequence(self, word: str) -> bool:
+        if len(word) > len(self.S):
+            return False
+        if self.next is not None:
+            return self._match_table(word)
+        i = 0  # the next usable position in S
+        for letter in word:
+            where = self.positions.get(letter)
+            if where is None:
+                return False
+            k = bisect_left(where, i)
+            if k == len(where):
+                return False
+            i = where[k] + 1
+        return True
+
+    def _match_table(self, word: str) -> bool:
+        end = len(self.S)
+        i = 0
+        for letter in word:
+            column = self.next.get(letter)
+            if column is None:
+                return False
+            i = column[i]
+            if i == end:
+                return False
+            i += 1
+        return True
+
+    def __contains__(self, word: str) -> bool:
+        return self.is_subsequence(word)
+
+    def matches(self, D: Iterable[str]) -> List[str]:
+        """every word of D that is a subsequence of S, in D's order"""
+        return [word for word in D if self.is_subsequence(word)]
+
+    def longest_match(self, D: Iterable[str]) -> Optional[str]:
+        """the longest word of D that is a subsequence of S (None if none is)
+
+        words are tried longest first, so the first hit is the answer and the
+        rest of D is never matched
+        """
+        n = len(self.S)
+        candidates = sorted((word for word in D if len(word) <= n), key=len, reverse=True)
+        for word in candidates:
+            if self.is_subsequence(word):
+                return word
+        return None
+
+
+# =================================================================
+#	all words in one scan
+# =================================================================
+# the index still matches D one word at a time. instead every word can wait
+# in a bucket keyed by the letter it needs next:
+#
+#   S = "abppplee", D = ["able", "ale", "apple"]
+#   waiting = {"a": [able@0, ale@0, apple@0]}
+#   read "a" -> waiting = {"b": [able@1], "l": [ale@1], "p": [apple@1]}
+#   read "b" -> ...
+#
+# each letter of S only wakes up the words waiting on it, so one left to right
+# pass matches everything in O(|S| + sum(|w|)).
+#
+# D is read batch_size words at a time (one pass over S per batch) so it can
+# be streamed from a file like names.txt without holding all of it
+
+
+def match_batch(S: str, words: List[str]) -> List[str]:
+    """the words that are subsequences of S, in the order they complete"""
+    matched = [word for word in words if not word]
+    waiting: Dict[str, List[Tuple[str, int]]] = defaultdict(list)
+    for word in words:
+        if word and len(word) <= len(S):
+            waiting[word[0]].append((word, 0))
+    for letter in S:
+        woken = waiting.pop(letter, None)
+        if woken is None:
+            continue
+        for word, k in woken:
+            k += 1
+            if k == len(word):
+                matched.append(word)
+            else:
+                waiting[word[k]].append((word, k))
+        if not waiting:
+            break
+    return matched
+
+
+def match_stream(S: str, D: Iterable[str], batch_size: int = 100_000) -> Iterator[str]:
+    """every word of D that is a subsequence of S, D is consumed lazily"""
+    words = iter(D)
+    while True:
+        batch = list(islice(words, batch_size))
+        if not batch:
+            return
+        yield from match_batch(S, batch)
+
+
+class StreamMatches:
+    """the matches of match_stream, counting them and keeping the longest
+    (the first one to reach the longest length) as they go by"""
+
+    def __init__(self, S: str, D: Iterable[str], batch_size: int = 100_000) -> None:
+        self.S = S
+        self.D = D
+        self.batch_size = batch_size
+        self.count = 0
+        self.longest: Optional[str] = None
+
+    def __iter__(self) -> Iterator[str]:
+        for word in match_stream(self.S, self.D, self.batch_size):
+            self.count += 1
+            if self.longest is None or len(word) > len(self.longest):
+                self.longest = word
+            yield word
+
+
+def longest_and_matches(
+    S: str, D: Iterable[str], batch_size: int = 100_000
+) -> Tuple[Optional[str], List[str]]:
+    stream = StreamMatches(S, D, batch_size)
+    matches = list(stream)
+    return stream.longest, matches
+
+
+def read_words(path: str) -> Iterator[str]:
+    """one word per line, e.g. names.txt from download_imdb.py"""
+    with open(path, encoding="utf-8") as source:
+        for line in source:
+            yield line.rstrip("\n")
+
+
+def main():
+    """Script entry point."""
+    parser = argparse.ArgumentParser(
+        description="the words of a file that are subsequences of S"
+    )
+    parser.add_argument("S")
+    parser.add_argument("path", help="one word per line, e.g. names.txt")
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--all", action="store_true", help="print every match")
+    args = parser.parse_args()
+
+    stream = StreamMatches(args.S, read_words(args.path), args.batch_size)
+    for word in stream:
+        if args.all:
+            print(word)
+    print(f"{stream.count:,} matches, longest: {stream.longest!r}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("Aborted")
@@ -1,39 +1,49 @@
-ratings = [1,2,87,87,87,2,1]
-# [1,2,3,1,3,2,1]
+import random
+import time
+from typing import Iterable, List, Sequence
 
-def update(ratings, score, i, j):
-    if ratings[i] > ratings[j] and score[i] <= score[j]:
-        score[i] = score[j] + 1
-    elif ratings[j] > ratings[i] and score[j] <= score[i]:
-        score[j] = score[i] + 1
-    return score
+import numpy as np
 
-score = [1 for _ in ratings]
+# =================================================================
+#	scratch pad
+# =================================================================
+if __name__ == "__main__":
+    ratings = [1,2,87,87,87,2,1]
+    # [1,2,3,1,3,2,1]
+
+    def update(ratings, score, i, j):
+        if ratings[i] > ratings[j] and score[i] <= score[j]:
+            score[i] = score[j] + 1
+        elif ratings[j] > ratings[i] and score[j] <= score[i]:
+            score[j] = score[i] + 1
+        return score
 
-print("forwards pass")
-for j in range(1, len(ratings)):
-    score = update(ratings, score, i=j-1, j=j)
-    print(score)
-print("backwards pass")
-for j in range(len(ratings)-1,0,-1):
-    # print(j,j-1)
-    score = update(ratings, score, j=j, i=j-1)
-    print(score)
+    score = [1 for _ in ratings]
 
-print(sum(score))
+    print("forwards pass")
+    for j in range(1, len(ratings)):
+        score = update(ratings, score, i=j-1, j=j)
+        print(score)
+    print("backwards pass")
+    for j in range(len(ratings)-1,0,-1):
+        # print(j,j-1)
+        score = update(ratings, score, j=j, i=j-1)
+        print(score)
 
+    print(sum(score))
 
-# score = [1 for _ in ratings]
 
-# for j in range(1,len(ratings)):
-#     i = j - 1
-#     if ratings[j] > ratings[i]:
-#         score[j] += 1
-#     elif ratings[i] > ratings[j]:
-#         if not score[i] > score[j]:
-#             score[i] += 1
+    # score = [1 for _ in ratings]
 
-# print(sum(score))
+    # for j in range(1,len(ratings)):
+    #     i = j - 1
+    #     if ratings[j] > ratings[i]:
+    #         score[j] += 1
+    #     elif ratings[i] > ratings[j]:
+    #         if not score[i] > score[j]:
+    #             score[i] += 1
+
+    # print(sum(score))
 
 # =================================================================
 #	Submitted solution
@@ -50,11 +60,152 @@ class Solution:
     def candy(self, ratings: List[int]) -> int:
         score = [1 for _ in ratings]
 
-        print("forwards pass")
+        # forwards pass
         for j in range(1, len(ratings)):
             score = update(ratings, score, i=j-1, j=j)
-        print("backwards pass")
+        # backwards pass
         for j in range(len(ratings)-1,0,-1):
             score = update(ratings, score, j=j, i=j-1)
 
-        return sum(score)
\ No newline at end of file
+        return sum(score)
+
+
+def candy_inline(ratings: List[int]) -> int:
+    """Solution.candy with update inlined (the 50% speed up noted above)"""
+    n = len(ratings)
+    score = [1] * n
+    for j in range(1, n):
+        if ratings[j] > ratings[j - 1]:
+            score[j] = score[j - 1] + 1
+    for j in range(n - 1, 0, -1):
+        if ratings[j - 1] > ratings[j] and score[j - 1] <= score[j]:
+            score[j - 1] = score[j] + 1
+    return sum(score)
+
+
+# =================================================================
+#	vectorized
+# =================================================================
+# the forward pass gives each child the length of the increasing run that ends
+# on them, the backward pass the length of the decreasing run that starts on
+# them, and the answer is the elementwise max of the two. both run lengths
+# are "distance to the last reset", where a reset is any position that doesn't
+# continue the run, so a running max over the reset positions gives them
+# without a python loop
+
+def run_lengths(rises: np.ndarray) -> np.ndarray:
+    """rises[i] is True when i continues the run from i-1, rises[0] must be False"""
+    idx = np.arange(len(rises))
+    last_reset = np.maximum.accumulate(np.where(rises, 0, idx))
+    return idx - last_reset + 1
+
+
+def candy_numpy(ratings: Sequence[float]) -> int:
+    return int(candy_batch([ratings])[0])
+
+
+def candy_batch(batch: Sequence[Sequence[float]]) -> np.ndarray:
+    """candy for many rating sequences in one call (a list or ragged array)
+
+    the sequences are concatenated and every boundary forces a reset, so the
+    runs never leak from one sequence into the next
+    """
+    lengths = np.fromiter((len(ratings) for ratings in batch), dtype=np.int64)
+    totals = np.zeros(len(lengths), dtype=np.int64)
+    keep = lengths > 0
+    if not keep.any():
+        return totals
+    # only comparisons are done on the ratings, so keep their dtype (float
+    # ratings must not be truncated), concatenate promotes to a common one
+    flat = np.concatenate([np.asarray(ratings) for ratings in batch if len(ratings)])
+    starts = np.concatenate(([0], np.cumsum(lengths[keep])[:-1]))
+    first = np.zeros(len(flat), dtype=bool)
+    first[starts] = True
+    last = np.roll(first, -1)
+
+    up = np.zeros(len(flat), dtype=bool)
+    up[1:] = flat[1:] > flat[:-1]
+    up &= ~first
+    down = np.zeros(len(flat), dtype=bool)
+    down[:-1] = flat[:-1] > flat[1:]
+    down &= ~last
+
+    left = run_lengths(up)
+    # the backward pass is the forward pass on the reversed array
+    right = run_lengths(down[::-1])[::-1]
+    totals[keep] = np.add.reduceat(np.maximum(left, right), starts)
+    return totals
+
+
+# =================================================================
+#	streaming
+# =================================================================
+# Solution.candy needs the whole list plus a score list of the same size. the
+# total can be built in one pass with three counters instead:
+#   up   - length of the current increasing slope
+#   down - length of the current decreasing slope
+#   peak - height of the peak the decreasing slope started from
+# on the way up each child gets one more than the last, on the way down every
+# child already on the slope gets bumped by one (the +down), and the peak only
+# needs a bump once the slope gets longer than the climb up to it
+
+def candy_stream(ratings: Iterable[int]) -> int:
+    """candy in one pass and O(1) memory, ratings can be any iterator
+
+    >>> with open("ratings.txt") as f:
+    ...     candy_stream(map(int, f))
+    """
+    ratings = iter(ratings)
+    prev = next(ratings, None)
+    if prev is None:
+        return 0
+    total = 1
+    up = down = peak = 0
+    for rating in ratings:
+        if rating > prev:
+            up += 1
+            peak = up
+            down = 0
+            total += 1 + up
+        elif rating == prev:
+            up = down = peak = 0
+            total += 1
+        else:
+            up = 0
+            down += 1
+            total += 1 + down - (1 if peak >= down else 0)
+        prev = rating
+    return total
+
+
+# =================================================================
+#	benchmark
+# =================================================================
+
+def random_ratings(rng: random.Random, n: int) -> List[int]:
+    return [rng.randint(0, 10) for _ in range(n)]
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+
+    # property check: every implementation agrees with Solution.candy
+    cases = [random_ratings(rng, rng.randint(0, 30)) for _ in range(2_000)]
+    expected = [Solution().candy(ratings) for ratings in cases]
+    assert [candy_inline(ratings) for ratings in cases] == expected
+    assert candy_batch(cases).tolist() == expected
+    assert [candy_stream(iter(ratings)) for ratings in cases] == expected
+    # float ratings are compared as they are, not truncated
+    floats = [[1.5, 1.2, 1.9], [0.5, 0.7, 0.6]]
+    assert candy_batch(floats).tolist() == [Solution().candy(r) for r in floats] == [5, 4]
+
+    batch = [random_ratings(rng, rng.randint(1, 200)) for _ in range(20_000)]
+    for label, run in (
+        ("update loop", lambda: [Solution().candy(r) for r in batch]),
+        ("inlined loop", lambda: [candy_inline(r) for r in batch]),
+        ("stream", lambda: [candy_stream(r) for r in batch]),
+        ("numpy batch", lambda: candy_batch(batch)),
+    ):
+        start = time.perf_counter()
+        run()
+        print(f"{label:>12}: {time.perf_counter() - start:8.3f} s")
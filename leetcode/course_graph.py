@@ -0,0 +1,179 @@
+# keep a course order valid while prerequisites come and go, instead of
+# calling findOrder again after every edit
+#
+# Pearce-Kelly dynamic topological sort:
+# - every course has a position (ord) in the current order
+# - deleting an edge never breaks the order, nothing to do
+# - adding b -> a (b before a) is only a problem when ord[a] < ord[b].
+#   then only the courses with a position between ord[a] and ord[b] can move:
+#     forward  = what a unlocks (searching forward from a, stop past ord[b])
+#     backward = what b needs (searching backward from b, stop before ord[a])
+#   if the forward search reaches b the new edge closes a cycle.
+#   otherwise both sets swap into the slots they already use, backward first.
+# so an edit costs the size of the affected region, not the whole graph
+import random
+import time
+from typing import Dict, List, Set
+
+from topological_sort import random_dag, topological_sort
+
+
+class CycleError(ValueError):
+    """adding the prerequisite would create a circular dependency"""
+
+    def __init__(self, cycle: List[int]) -> None:
+        super().__init__(f"circular dependency: {cycle}")
+        self.cycle = cycle
+
+
+class CourseGraph:
+    def __init__(self, numCourses: int, prerequisites: List[List[int]] = ()) -> None:
+        self.numCourses = numCourses
+        # after[b] = courses that need b, before[a] = courses a needs
+        # sets so deleting an edge is O(1)
+        self.after: List[Set[int]] = [set() for _ in range(numCourses)]
+        self.before: List[Set[int]] = [set() for _ in range(numCourses)]
+        for a, b in prerequisites:
+            self.after[b].add(a)
+            self.before[a].add(b)
+
+        schedule = topological_sort(numCourses, [[a, b] for a, b in self.edges()])
+        if schedule.cycle:
+            raise CycleError(schedule.cycle)
+        # order[i] is the course in slot i, ord[n] is the slot of course n
+        self.order: List[int] = schedule.order
+        self.ord: List[int] = [0] * numCourses
+        for i, n in enumerate(self.order):
+            self.ord[n] = i
+
+    @classmethod
+    def from_case(cls, case) -> "CourseGraph":
+        """build from a course_schedule_ii.Case (or anything shaped like it)"""
+        return cls(case.numCourses, case.prerequisites)
+
+    def edges(self):
+        for b, needs_b in enumerate(self.after):
+            for a in needs_b:
+                yield a, b
+
+    def findOrder(self) -> List[int]:
+        return list(self.order)
+
+    # -----------------------------------------------------------------
+    #	edits
+    # -----------------------------------------------------------------
+    def remove(self, a: int, b: int) -> None:
+        """drop prerequisite [a, b], the current order stays valid"""
+        self.after[b].discard(a)
+        self.before[a].discard(b)
+
+    def add(self, a: int, b: int) -> None:
+        """add prerequisite [a, b] (b before a), raises CycleError on a loop"""
+        if a == b:
+            raise CycleError([a])
+        if a in self.after[b]:
+            return
+        lower, upper = self.ord[a], self.ord[b]
+        if lower < upper:
+            # a currently comes first, repair the slots between them
+            forward = self._forward(a, upper)
+            if forward is None:
+                raise CycleError(self._cycle(a, b))
+            backward = self._backward(b, lower)
+            self._reorder(backward, forward)
+        self.after[b].add(a)
+        self.before[a].add(b)
+
+    def _forward(self, start: int, upper: int):
+        """courses reachable from start with a slot <= upper, None if it hits upper"""
+        ord_, after = self.ord, self.after
+        seen = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for nxt in after[node]:
+                slot = ord_[nxt]
+                if slot == upper:
+                    return None
+                if slot < upper and nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return seen
+
+    def _backward(self, start: int, lower: int) -> Set[int]:
+        """courses start depends on with a slot > lower"""
+        ord_, before = self.ord, self.before
+        seen = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for prv in before[node]:
+                if ord_[prv] > lower and prv not in seen:
+                    seen.add(prv)
+                    stack.append(prv)
+        return seen
+
+    def _reorder(self, backward: Set[int], forward: Set[int]) -> None:
+        """reuse the slots of both sets, everything in backward goes first"""
+        ord_ = self.ord
+        moved = sorted(backward, key=ord_.__getitem__) + sorted(
+            forward, key=ord_.__getitem__
+        )
+        slots = sorted(ord_[n] for n in moved)
+        for slot, node in zip(slots, moved):
+            ord_[node] = slot
+            self.order[slot] = node
+
+    def _cycle(self, a: int, b: int) -> List[int]:
+        """the loop [a, b] would close: a ... b through existing edges, then b -> a"""
+        parent: Dict[int, int] = {a: -1}
+        stack = [a]
+        while stack:
+            node = stack.pop()
+            if node == b:
+                break
+            for nxt in self.after[node]:
+                if nxt not in parent:
+                    parent[nxt] = node
+                    stack.append(nxt)
+        path = []
+        node = b
+        while node != -1:
+            path.append(node)
+            node = parent[node]
+        # path is b back to a, flip it so each course comes before the one
+        # that needs it
+        return path[::-1]
+
+
+# =================================================================
+#	benchmark: small edits on a large graph
+# =================================================================
+
+if __name__ == "__main__":
+    n, edits = 100_000, 1_000
+    rng = random.Random(1)
+    prerequisites = random_dag(n)
+    graph = CourseGraph(n, prerequisites)
+
+    start = time.perf_counter()
+    added = 0
+    for _ in range(edits):
+        a, b = rng.randrange(n), rng.randrange(n)
+        try:
+            graph.add(a, b)
+            added += 1
+        except CycleError:
+            pass
+        c, d = prerequisites[rng.randrange(len(prerequisites))]
+        graph.remove(c, d)
+    incremental = (time.perf_counter() - start) / edits
+
+    edges = [[a, b] for a, b in graph.edges()]
+    start = time.perf_counter()
+    topological_sort(n, edges)
+    full = time.perf_counter() - start
+
+    print(f"V={n:,}, {edits} edits ({added} adds kept)")
+    print(f"incremental: {incremental * 1e3:8.3f} ms/edit")
+    print(f"full resort: {full * 1e3:8.3f} ms/edit")
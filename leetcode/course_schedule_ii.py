@@ -2,6 +2,7 @@
 # Return the ordering of courses you should take to finish all courses
 # prerequisites_i = a_i, b_i
 # b_i must be completed before a_i
+from collections import deque
 from typing import NamedTuple, List
 
 
@@ -99,30 +100,30 @@ print(f"bar={bar}")
 # =================================================================
 # 	submission for leetcode
 # =================================================================
-def remove_k_from_foo(foo, k):
-    # remove k from all other lists
-    for k_, v_ in foo.items():
-        if k in v_:
-            foo[k_] = [i for i in v_ if i != k]
-    return foo
-
-
+# NOTE: the first submission rescanned foo for an empty list on every pass and
+# rebuilt every adjacency list with remove_k_from_foo, O(V^2 * E).
+# this is Kahn's algorithm (see topological_sort.py for the full version with
+# cycle reporting and layers): count the prerequisites of each course and only
+# touch a course's own edges when it is taken, O(V + E)
 class Solution:
     def findOrder(self, numCourses: int, prerequisites: List[List[int]]) -> List[int]:
-        foo = {n: [] for n in range(numCourses)}
+        after = [[] for _ in range(numCourses)]
+        indegree = [0] * numCourses
         for c, d in prerequisites:
-            foo[c].append(d)
+            after[d].append(c)
+            indegree[c] += 1
 
+        ready = deque(n for n in range(numCourses) if indegree[n] == 0)
         bar = []
-        for _ in range(numCourses):
-            for k, v in foo.items():
-                if not v:
-                    bar.append(k)
-                    del foo[k]
-                    foo = remove_k_from_foo(foo, k)
-                    break
-        # if foo isn't empty there is a circular dependency
-        if not foo:
+        while ready:
+            k = ready.popleft()
+            bar.append(k)
+            for k_ in after[k]:
+                indegree[k_] -= 1
+                if indegree[k_] == 0:
+                    ready.append(k_)
+        # if a course was never taken there is a circular dependency
+        if len(bar) == numCourses:
             return bar
         else:
             return []
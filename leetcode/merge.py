@@ -0,0 +1,215 @@
+# k-way merge, the generalization of merge_sort.bar from 2 sorted inputs to k
+#
+# bar compares the tails of 2 arrays, with k arrays the "which one is next"
+# question is answered by a heap holding the current head of every input, so
+# each element costs O(log k) instead of O(k).
+#
+# everything only uses len(), [] and iteration on the buffers, so lists,
+# array.array, memoryview and numpy arrays all work as they are, nothing is
+# converted to a list.
+#
+# stability: equal values come out ordered by input (sources[0] first), and in
+# their original order within an input. the heap entries carry the input index
+# as the tie break to guarantee that.
+import heapq
+import random
+import time
+from array import array
+from operator import index
+from typing import Any, List, MutableSequence, Optional, Sequence
+
+
+def merge_into(
+    sources: Sequence[Sequence[Any]], out: Optional[MutableSequence[Any]] = None
+) -> MutableSequence[Any]:
+    """merge sorted sources front to back into out (a new list if None)"""
+    total = sum(len(source) for source in sources)
+    if out is None:
+        out = [None] * total
+    elif len(out) < total:
+        raise ValueError(f"out holds {len(out)} elements, {total} needed")
+
+    # heap entries are [head value, input index, next()], updated in place so
+    # the hot loop doesn't build a tuple per element (same trick as heapq.merge)
+    heap = _heads([iter(source) for source in sources])
+    k = 0
+    while len(heap) > 1:
+        try:
+            while True:
+                entry = heap[0]
+                out[k] = entry[0]
+                k += 1
+                entry[0] = entry[2]()
+                heapq.heapreplace(heap, entry)
+        except StopIteration:
+            heapq.heappop(heap)
+    if heap:
+        # one input left, copy the rest of it over
+        value, _, nxt = heap[0]
+        out[k] = value
+        for k, value in enumerate(_drain(nxt), k + 1):
+            out[k] = value
+    return out
+
+
+def merge_in_place(
+    first: MutableSequence[Any], m: int, others: Sequence[Sequence[Any]]
+) -> MutableSequence[Any]:
+    """merge others into first, where first[:m] is sorted data and the tail is free
+
+    the same trick as bar: fill from the back, taking the largest tail each
+    time. the write position never passes the unread part of first, so no
+    scratch buffer is needed
+    """
+    total = m + sum(len(source) for source in others)
+    if total > len(first):
+        raise ValueError(f"first holds {len(first)} elements, {total} needed")
+
+    # walk every input backwards, a max heap by negating the values: the
+    # larger input index wins a tie because it has to end up further back.
+    # values that can't be negated (str, ...) go in a _Reversed wrapper
+    # instead, which is ~3x slower because every comparison is python code
+    inputs = [(first, m)] + [(source, len(source)) for source in others]
+    wrap = not all(_negatable(source, stop) for source, stop in inputs)
+    heap = _heads([_backwards(source, stop, wrap) for source, stop in inputs])
+    for entry in heap:
+        entry[1] = -entry[1]
+    heapq.heapify(heap)
+
+    write = total - 1
+    while heap:
+        entry = heap[0]
+        if len(heap) == 1 and entry[1] == 0:
+            # only first's own data is left and it is already in place
+            break
+        first[write] = entry[0].value if wrap else -entry[0]
+        write -= 1
+        try:
+            entry[0] = entry[2]()
+            heapq.heapreplace(heap, entry)
+        except StopIteration:
+            heapq.heappop(heap)
+    return first
+
+
+def _heads(iterators) -> List[list]:
+    """[first value, input index, next()] for every non empty input"""
+    heap = []
+    for i, iterator in enumerate(iterators):
+        nxt = iterator.__next__
+        try:
+            heap.append([nxt(), i, nxt])
+        except StopIteration:
+            pass
+    heapq.heapify(heap)
+    return heap
+
+
+class _Reversed:
+    """a value that sorts the other way round, for values that can't be negated"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __lt__(self, other: "_Reversed") -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other: object) -> bool:
+        return self.value == other.value
+
+
+def _int_dtype(source) -> bool:
+    """a numpy array of ints (fixed width, negating can wrap around)"""
+    return getattr(getattr(source, "dtype", None), "kind", "") in ("i", "u")
+
+
+def _negatable(source, stop: int) -> bool:
+    """can the values be negated (checked on one of them)"""
+    if stop == 0 or _int_dtype(source):
+        return True
+    try:
+        -source[0]
+    except TypeError:
+        return False
+    return True
+
+
+def _backwards(source, stop: int, wrap: bool):
+    """source[stop-1], ..., source[0] as max heap keys"""
+    if wrap:
+        for i in range(stop - 1, -1, -1):
+            yield _Reversed(source[i])
+    elif _int_dtype(source):
+        # numpy ints are fixed width and -0 of an unsigned one wraps around,
+        # as a python int it can't
+        for i in range(stop - 1, -1, -1):
+            yield -index(source[i])
+    else:
+        for i in range(stop - 1, -1, -1):
+            yield -source[i]
+
+
+def _drain(nxt):
+    try:
+        while True:
+            yield nxt()
+    except StopIteration:
+        return
+
+
+# =================================================================
+#	benchmark: 100 sorted shards
+# =================================================================
+
+if __name__ == "__main__":
+    import numpy as np
+
+    # unsigned numpy buffers, a 0 must stay at the front
+    first = np.array([0, 5, 9, 0, 0, 0], dtype=np.uint32)
+    merge_in_place(first, 3, [np.array([2, 6, 7], dtype=np.uint32)])
+    assert first.tolist() == [0, 2, 5, 6, 7, 9], first
+    first = np.array([0, 0, 0, 0], dtype=np.uint8)
+    merge_in_place(first, 1, [np.array([0, 3], dtype=np.uint8), np.array([0], dtype=np.uint8)])
+    assert first.tolist() == [0, 0, 0, 3], first
+    out = merge_into(
+        [np.array([0, 4], dtype=np.uint64), np.array([1, 2], dtype=np.uint64)],
+        np.zeros(4, dtype=np.uint64),
+    )
+    assert out.tolist() == [0, 1, 2, 4], out
+    # values that can't be negated still merge
+    words = ["b", "d", None, None]
+    assert merge_in_place(words, 2, [["a", "c"]]) == ["a", "b", "c", "d"]
+
+    rng = random.Random(0)
+    shards = [
+        array("q", sorted(rng.randrange(10**9) for _ in range(10_000)))
+        for _ in range(100)
+    ]
+    total = sum(len(shard) for shard in shards)
+    expected = sorted(x for shard in shards for x in shard)
+
+    def preallocated():
+        return merge_into(shards, array("q", bytes(8 * total)))
+
+    def in_place():
+        first = array("q", shards[0]) + array("q", bytes(8 * (total - len(shards[0]))))
+        return merge_in_place(first, len(shards[0]), shards[1:])
+
+    def memoryviews():
+        views = [memoryview(shard) for shard in shards]
+        return merge_into(views, memoryview(array("q", bytes(8 * total))))
+
+    for label, run in (
+        ("merge_into", preallocated),
+        ("in place", in_place),
+        ("memoryview", memoryviews),
+        ("heapq.merge", lambda: list(heapq.merge(*shards))),
+        ("sorted(a+b)", lambda: sorted([x for shard in shards for x in shard])),
+    ):
+        start = time.perf_counter()
+        result = run()
+        seconds = time.perf_counter() - start
+        assert list(result) == expected, label
+        print(f"{label:>12}: {seconds:8.3f} s")
@@ -1,3 +1,12 @@
+import mmap
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, Union
+
 # look at each char in s
 # if opening bracket add to stack
 # if closing bracket and stack not empty
@@ -27,3 +36,324 @@ def foo(s):
 
     # true iff the stack isn't empty
     return len(stack) == 0
+
+
+# =================================================================
+#	streaming validator
+# =================================================================
+# foo needs the whole string in memory, does a python step for every
+# character and only says True/False. BracketValidator takes the input in
+# chunks (bytes or str), keeps the unclosed openers in a bytearray between
+# feed() calls, and remembers the byte offset of the first error. str chunks
+# count as their utf-8 bytes, so str and bytes chunks can be mixed and the
+# offset is the same as for the file they came from
+#
+# the fast path never loops over characters in python:
+# 1. drop everything that isn't a bracket (bytes.translate, C speed)
+# 2. delete adjacent matched pairs "()", "[]", "{}" with bytes.replace. a
+#    pair like that is a push and its pop, it can never cause an error, so
+#    this doesn't change the answer. repeat until a round removes little
+#    (deep nesting only peels one level per round, step 4 does the rest)
+# 3. what is left is normally "closers then openers": the closers have to
+#    match the top of the stack, the openers get pushed
+# 4. anything else is checked exactly, with a stack over the leftover
+#    brackets as ints (like foo, but only over what is left)
+# only once that finds an error is the chunk itself walked again, from the
+# stack as it was, to find the offset
+#
+# on brackets-only input (the leetcode problem) it agrees with foo. other
+# characters are skipped, so it can check a source file or a json document,
+# where foo would call any of them an unmatched closer
+
+Chunk = Union[str, bytes, bytearray, memoryview]
+
+_NOT_BRACKETS = bytes(b for b in range(256) if b not in b"()[]{}")
+_BRACKETS = re.compile(rb"[()\[\]{}]")
+_REDUCED = re.compile(rb"([)\]}]*)([(\[{]*)")
+_CLOSER_TO_OPENER = bytes.maketrans(b")]}", b"([{")
+_PAIRS = (b"()", b"[]", b"{}")
+# replace rounds before giving up on the fast path, each round peels one
+# level of nesting
+MAX_ROUNDS = 64
+# a round that removes less than 1/MIN_SHRINK of what is left is the last
+MIN_SHRINK = 8
+
+
+class BracketValidator:
+    def __init__(self, strict: bool = False) -> None:
+        # strict: any other character is an error, exactly foo's answer
+        self.strict = strict
+        # the unclosed openers, one byte each
+        self.stack = bytearray()
+        # how many bytes have been fed so far (str chunks as utf-8)
+        self.offset = 0
+        # byte offset of the first error, the input size when openers are
+        # left unclosed
+        self.error: Optional[int] = None
+
+    @property
+    def valid(self) -> bool:
+        return self.error is None
+
+    def feed(self, chunk: Chunk) -> bool:
+        """process the next piece of input, False once an error was found"""
+        if self.error is not None:
+            return False
+        data = chunk.encode("utf-8") if isinstance(chunk, str) else bytes(chunk)
+        brackets = data.translate(None, _NOT_BRACKETS)
+        if self.strict and len(brackets) != len(data):
+            # some other character, an error somewhere
+            self._scan(data)
+        elif not self._apply(reduce_pairs(brackets)):
+            self._scan(data)
+        self.offset += len(data)
+        return self.error is None
+
+    def close(self) -> bool:
+        """end of input, anything still open is an error"""
+        if self.error is None and self.stack:
+            self.error = self.offset
+        return self.error is None
+
+    def _apply(self, reduced: bytes) -> bool:
+        """match reduced against the stack, False (stack untouched) on an error"""
+        match = _REDUCED.fullmatch(reduced)
+        if match is None:
+            return self._exact(reduced)
+        closers, openers = match.groups()
+        if closers:
+            expected = closers.translate(_CLOSER_TO_OPENER)[::-1]
+            if not self.stack.endswith(expected):
+                return False
+            del self.stack[-len(closers) :]
+        self.stack += openers
+        return True
+
+    def _exact(self, brackets: bytes) -> bool:
+        """foo's loop over the bracket bytes (ints), only touches the stack
+        once the whole chunk is known to be fine"""
+        stack = self.stack
+        # the part of the stack not popped yet, and the openers pushed on top
+        depth = len(stack)
+        pushed = bytearray()
+        for c in brackets:
+            if c in b"([{":
+                pushed.append(c)
+            elif pushed:
+                if pushed[-1] != _CLOSER_TO_OPENER[c]:
+                    return False
+                pushed.pop()
+            elif depth and stack[depth - 1] == _CLOSER_TO_OPENER[c]:
+                depth -= 1
+            else:
+                return False
+        del stack[depth:]
+        stack += pushed
+        return True
+
+    def _scan(self, data: bytes) -> None:
+        """walk data itself from the current stack to find the error offset"""
+        stack = self.stack
+        if self.strict:
+            found = enumerate(data)
+        else:
+            found = (
+                (match.start(), data[match.start()]) for match in _BRACKETS.finditer(data)
+            )
+        for position, c in found:
+            if c in b"([{":
+                stack.append(c)
+            elif c in b")]}" and stack and stack[-1] == _CLOSER_TO_OPENER[c]:
+                stack.pop()
+            else:
+                self.error = self.offset + position
+                return
+
+
+def reduce_pairs(brackets: bytes) -> bytes:
+    """delete adjacent matched pairs until a round removes (almost) nothing"""
+    for _ in range(MAX_ROUNDS):
+        size = len(brackets)
+        for pair in _PAIRS:
+            brackets = brackets.replace(pair, b"")
+        if (size - len(brackets)) * MIN_SHRINK <= size:
+            break
+    return brackets
+
+
+def validate(chunks, strict: bool = False) -> BracketValidator:
+    """feed every chunk (stops at the first error) and close"""
+    validator = BracketValidator(strict)
+    for chunk in chunks:
+        if not validator.feed(chunk):
+            break
+    validator.close()
+    return validator
+
+
+def read_chunks(path: str, chunk_size: int = 1 << 20):
+    with open(path, "rb") as source:
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+# =================================================================
+#	parallel
+# =================================================================
+# once the matched pairs are gone a chunk is just a signature
+#
+#   (unmatched closers, unmatched openers) e.g. "])" + "(({"
+#
+# and two signatures combine like two chunks would: the left openers meet the
+# right closers and have to match, whatever is left over carries on. that is
+# associative, so the chunks can be reduced in any process in any order and
+# only the (small) signatures are combined in order at the end.
+# a chunk that is wrong on its own ("(]") has no signature, and neither does
+# one that combines wrong. that chunk is scanned again, exactly, from the stack
+# the chunks before it left, which gives the same error offset as validate()
+Signature = Tuple[bytes, bytes]
+
+
+def signature(brackets: bytes) -> Optional[Signature]:
+    """(closers, openers) left after matching, None on a mismatch"""
+    reduced = reduce_pairs(brackets)
+    match = _REDUCED.fullmatch(reduced)
+    if match is not None:
+        return match.group(1), match.group(2)
+    # deeper than MAX_ROUNDS, or a mismatch: do it with a stack
+    closers = bytearray()
+    stack = bytearray()
+    for c in reduced:
+        if c in b"([{":
+            stack.append(c)
+        elif stack:
+            if stack[-1] != _CLOSER_TO_OPENER[c]:
+                return None
+            stack.pop()
+        else:
+            closers.append(c)
+    return bytes(closers), bytes(stack)
+
+
+def combine(left: Signature, right: Signature) -> Optional[Signature]:
+    """the signature of two neighbouring chunks, None on a mismatch"""
+    closers, openers = left
+    right_closers, right_openers = right
+    k = min(len(openers), len(right_closers))
+    if k and openers[-k:] != right_closers[:k].translate(_CLOSER_TO_OPENER)[::-1]:
+        return None
+    return (
+        closers + right_closers[k:],
+        openers[: len(openers) - k] + right_openers,
+    )
+
+
+def _chunk_signature(task: Tuple[str, int, int, bool]) -> Optional[Signature]:
+    path, start, end, strict = task
+    with open(path, "rb") as source, mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        brackets = mm[start:end].translate(None, _NOT_BRACKETS)
+    if strict and len(brackets) != end - start:
+        return None
+    return signature(brackets)
+
+
+def parallel_validate(
+    path: str, workers: int = os.cpu_count() or 1, chunk_size: int = 8 << 20, strict: bool = False
+) -> BracketValidator:
+    """validate(read_chunks(path)) with the chunks reduced in a process pool"""
+    validator = BracketValidator(strict)
+    size = os.path.getsize(path)
+    bounds = list(range(0, size, chunk_size)) + [size]
+    tasks = [(path, lo, hi, strict) for lo, hi in zip(bounds, bounds[1:])]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        signatures: List[Optional[Signature]] = list(pool.map(_chunk_signature, tasks))
+    total: Signature = (b"", b"")
+    for (_, lo, hi, _), sig in zip(tasks, signatures):
+        combined = None if sig is None else combine(total, sig)
+        if combined is None or combined[0]:
+            # the error is in this chunk, find where from the stack so far
+            validator.stack = bytearray(total[1])
+            validator.offset = lo
+            with open(path, "rb") as source, mmap.mmap(
+                source.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mm:
+                validator._scan(mm[lo:hi])
+            return validator
+        total = combined
+    validator.stack = bytearray(total[1])
+    validator.offset = size
+    validator.close()
+    return validator
+
+
+if __name__ == "__main__":
+    # strict mode gives foo's answer, other characters (ascii or not) are errors
+    for case in ["()[]{}", "(]", "(é)", "é", "([{}])x", "(((", ""]:
+        for chunks in ([case], [case.encode("utf-8")], list(case)):
+            assert validate(chunks, strict=True).valid == foo(case), (case, chunks)
+    # offsets are in bytes, whatever mix of str and bytes came in
+    assert validate(["é(", b"\xc3\xa9]"]).error == 5
+
+    # brackets only so foo can read it too, 16 MB with some nesting
+    unit = b"{[()()]}([]){}[[({})]]"
+    data = b"(" + unit * (16 * 2**20 // len(unit)) + b")"
+    mb = len(data) / 2**20
+    chunk_size = 1 << 20
+
+    start = time.perf_counter()
+    validator = validate(data[i : i + chunk_size] for i in range(0, len(data), chunk_size))
+    seconds = time.perf_counter() - start
+    print(f"BracketValidator: {mb / seconds:8.1f} MB/s, valid={validator.valid}")
+
+    text = data.decode("ascii")
+    start = time.perf_counter()
+    result = foo(text)
+    seconds = time.perf_counter() - start
+    print(f"foo:              {mb / seconds:8.1f} MB/s, valid={result}")
+
+    # nested deeper than the replace rounds reach, the exact path does the work
+    deep = b"(" * 100 + b")" * 100
+    deep = deep * (4 * 2**20 // len(deep))
+    deep_chunks = [deep[i : i + chunk_size] for i in range(0, len(deep), chunk_size)]
+    for label, run in (
+        ("deep, validate", lambda: validate(deep_chunks).valid),
+        ("deep, foo", lambda: foo(deep.decode("ascii"))),
+    ):
+        start = time.perf_counter()
+        result = run()
+        seconds = time.perf_counter() - start
+        print(f"{label + ':':<18}{len(deep) / 2**20 / seconds:8.1f} MB/s, valid={result}")
+
+    # the first error is reported wherever the chunk boundaries fall
+    broken = data[:-100] + b"]" + data[-99:]
+    validator = validate(broken[i : i + chunk_size] for i in range(0, len(broken), chunk_size))
+    print(f"error at byte {validator.error:,} of {len(broken):,}")
+
+    # parallel: $ python string_parenthesis.py 512  (MB)
+    mb = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "brackets.txt")
+        with open(path, "wb") as destination:
+            destination.write(b"(")
+            block = unit * (2**20 // len(unit))
+            for _ in range(mb):
+                destination.write(block)
+            destination.write(b")")
+        start = time.perf_counter()
+        expected = validate(read_chunks(path), strict=True)
+        single = time.perf_counter() - start
+        print(f"{'validate':>20}: {mb / single:8.1f} MB/s")
+        workers = 1
+        while workers <= (os.cpu_count() or 1) * 2:
+            start = time.perf_counter()
+            result = parallel_validate(path, workers, strict=True)
+            seconds = time.perf_counter() - start
+            assert (result.valid, result.error) == (expected.valid, expected.error)
+            print(
+                f"{f'parallel, {workers} workers':>20}: {mb / seconds:8.1f} MB/s,"
+                f" {single / seconds:4.1f}x"
+            )
+            workers *= 2
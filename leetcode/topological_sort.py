@@ -0,0 +1,116 @@
+# Kahn's algorithm for the course schedule ii problem, but for big graphs
+# see course_schedule_ii.md for the concept
+#
+# the leetcode submission (course_schedule_ii.py) found the "first thing" by
+# scanning every key of the adjacency dict and then rebuilt every adjacency
+# list to remove it, O(V^2 * E). here:
+# - indegree[n] counts the prerequisites of n that aren't taken yet
+# - a deque holds every course whose indegree dropped to 0
+# - taking a course only touches its own outgoing edges
+# so each node and each edge is handled once, O(V + E)
+import random
+import time
+from collections import deque
+from typing import List, NamedTuple
+
+
+class Schedule(NamedTuple):
+    # every course in a valid order, [] if there is a cycle
+    order: List[int]
+    # courses grouped by "round", everything in a layer can be taken in parallel
+    layers: List[List[int]]
+    # the courses on one circular dependency, [] if there is none
+    cycle: List[int]
+
+
+def adjacency(numCourses: int, prerequisites: List[List[int]]) -> List[List[int]]:
+    """after[b] lists the courses that need b, i.e. the edges b -> a"""
+    after: List[List[int]] = [[] for _ in range(numCourses)]
+    for a, b in prerequisites:
+        after[b].append(a)
+    return after
+
+
+def topological_sort(
+    numCourses: int, prerequisites: List[List[int]], layers: bool = False
+) -> Schedule:
+    after = adjacency(numCourses, prerequisites)
+    indegree = [0] * numCourses
+    for a, _ in prerequisites:
+        indegree[a] += 1
+
+    order: List[int] = []
+    groups: List[List[int]] = []
+    ready = deque(n for n in range(numCourses) if indegree[n] == 0)
+    while ready:
+        # one pass of this loop is one layer, the deque only holds that layer
+        # when it starts, courses it unlocks go on the end for the next pass
+        layer_size = len(ready)
+        if layers:
+            groups.append(list(ready))
+        for _ in range(layer_size):
+            node = ready.popleft()
+            order.append(node)
+            for nxt in after[node]:
+                indegree[nxt] -= 1
+                if indegree[nxt] == 0:
+                    ready.append(nxt)
+
+    if len(order) == numCourses:
+        return Schedule(order=order, layers=groups, cycle=[])
+    return Schedule(order=[], layers=[], cycle=find_cycle(numCourses, prerequisites, indegree))
+
+
+def find_cycle(
+    numCourses: int, prerequisites: List[List[int]], indegree: List[int]
+) -> List[int]:
+    """walk backwards through the courses Kahn couldn't take until one repeats
+
+    every leftover course still has a leftover prerequisite, so the walk can
+    never get stuck and has to close a loop within numCourses steps
+    """
+    before: List[int] = [-1] * numCourses
+    for a, b in prerequisites:
+        if indegree[a] > 0 and indegree[b] > 0:
+            before[a] = b
+
+    node = next(n for n in range(numCourses) if indegree[n] > 0)
+    seen = {}
+    path: List[int] = []
+    while node not in seen:
+        seen[node] = len(path)
+        path.append(node)
+        node = before[node]
+    # path runs against the edges, flip it so each course comes before the
+    # course that needs it
+    return path[seen[node]:][::-1]
+
+
+# =================================================================
+#	scaling benchmark
+# =================================================================
+
+def random_dag(numCourses: int, edges_per_node: int = 3, seed: int = 0) -> List[List[int]]:
+    """each course needs a few courses that come earlier in a shuffled order"""
+    rng = random.Random(seed)
+    rank = list(range(numCourses))
+    rng.shuffle(rank)
+    prerequisites = []
+    for i in range(1, numCourses):
+        for _ in range(min(i, edges_per_node)):
+            prerequisites.append([rank[i], rank[rng.randrange(i)]])
+    return prerequisites
+
+
+if __name__ == "__main__":
+    for exponent in range(3, 7):
+        n = 10 ** exponent
+        prerequisites = random_dag(n)
+        start = time.perf_counter()
+        schedule = topological_sort(n, prerequisites, layers=True)
+        seconds = time.perf_counter() - start
+        assert len(schedule.order) == n
+        print(
+            f"V=10^{exponent} E={len(prerequisites):>9,}: {seconds:7.3f} s, "
+            f"{len(schedule.layers)} layers"
+        )
@@ -1,3 +1,11 @@
+import contextlib
+import io
+import random
+import string
+import time
+from collections import Counter
+from typing import Callable, List, Optional, Tuple
+
 # board = [["A","B","E"],["S","F","C"],["A","B","C"]]
 # word = "ABC"
 
@@ -52,26 +60,161 @@ def descend_tree(i,j,board,stack,word):
     return stack
 
 
+# =================================================================
+#	production search
+# =================================================================
+# descend_tree above is the learning version, it has two hidden costs:
+# - `(i-1,j) not in stack` scans the path list, so every neighbour check is
+#   linear in the length of the word
+# - the f-strings get formatted on every step even if nobody reads them
+# exist() instead:
+# - flattens the board and marks visited cells in a bytearray, O(1) checks
+# - runs an explicit stack (no recursion limit on long words)
+# - rejects the word up front if the board doesn't have enough of a letter
+# - searches from whichever end of the word is rarer on the board, fewer starts
+# - only traces when a hook is passed in
+
+Trace = Callable[[str, List[Tuple[int, int]]], None]
+
+
+def print_trace(event: str, path: List[Tuple[int, int]]) -> None:
+    """a trace hook that prints like descend_tree did"""
+    print(f"{event}: stack={path}")
+
+
+def exist(board: List[List[str]], word: str, trace: Optional[Trace] = None) -> bool:
+    m, n = len(board), len(board[0])
+    cells = [letter for row in board for letter in row]
+    if not word or len(word) > len(cells):
+        return False
+
+    # letter-frequency pruning
+    available = Counter(cells)
+    for letter, count in Counter(word).items():
+        if available[letter] < count:
+            return False
+    if available[word[-1]] < available[word[0]]:
+        # a path read backwards is still a path
+        word = word[::-1]
+
+    visited = bytearray(m * n)
+    last = len(word) - 1
+    size = m * n
+    for start in range(size):
+        if cells[start] != word[0]:
+            continue
+        if last == 0:
+            return True
+        visited[start] = 1
+        # path[k] is the cell matching word[k], moves[k] the next direction to try
+        path = [start]
+        moves = [0]
+        while path:
+            cell = path[-1]
+            direction = moves[-1]
+            if direction == 4:
+                # every neighbour tried, back up one letter
+                visited[cell] = 0
+                if trace is not None:
+                    trace("pop", [divmod(c, n) for c in path])
+                path.pop()
+                moves.pop()
+                continue
+            moves[-1] = direction + 1
+
+            if direction == 0:
+                nxt = cell - n if cell >= n else -1
+            elif direction == 1:
+                nxt = cell + n if cell + n < size else -1
+            elif direction == 2:
+                nxt = cell - 1 if cell % n else -1
+            else:
+                nxt = cell + 1 if cell % n != n - 1 else -1
+            if nxt < 0 or visited[nxt] or cells[nxt] != word[len(path)]:
+                continue
+
+            if len(path) == last:
+                if trace is not None:
+                    trace("found", [divmod(c, n) for c in path + [nxt]])
+                return True
+            visited[nxt] = 1
+            path.append(nxt)
+            moves.append(0)
+            if trace is not None:
+                trace("push", [divmod(c, n) for c in path])
+    return False
+
+
+def descend_tree_exist(board, word) -> bool:
+    """the original script as a function, prints swallowed"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        stack = []
+        for i, j in base(board, word):
+            if len(stack) == len(word):
+                break
+            stack.append((i, j))
+            stack = descend_tree(i, j, board, stack, word)
+    return len(stack) == len(word)
+
+
+def walk(board, length, rng) -> str:
+    """letters along a random self avoiding path"""
+    m, n = len(board), len(board[0])
+    i, j = rng.randrange(m), rng.randrange(n)
+    path = [(i, j)]
+    while len(path) < length:
+        options = [
+            (a, b)
+            for a, b in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1))
+            if 0 <= a < m and 0 <= b < n and (a, b) not in path
+        ]
+        if not options:
+            break
+        i, j = rng.choice(options)
+        path.append((i, j))
+    return "".join(board[a][b] for a, b in path)
+
+
+def benchmark(size: int = 60, length: int = 40, seed: int = 0) -> None:
+    """long words on a large board, descend_tree vs exist"""
+    rng = random.Random(seed)
+    letters = string.ascii_uppercase[:4]
+    board = [[rng.choice(letters) for _ in range(size)] for _ in range(size)]
+    # half the words are traced on the board, half are random letters
+    words = [walk(board, length, rng) for _ in range(10)]
+    words += ["".join(rng.choices(letters, k=length)) for _ in range(10)]
+
+    for label, search in (("descend_tree", descend_tree_exist), ("exist", exist)):
+        start = time.perf_counter()
+        hits = sum(search(board, w) for w in words)
+        seconds = time.perf_counter() - start
+        print(f"{label:>12}: {seconds:8.3f} s ({hits}/{len(words)} found)")
+
+
 # =================================================================
 #	script
 # =================================================================
-print("Board:")
-for line in board:
-    print(line)
-print('-'*30)
-print(f"Match Word: {word}")
-print('-'*30)
-stack = []
-
-for i,j in base(board, word):
-    if len(stack) == len(word): break
-    stack.append((i,j))
-    print((i,j))
-    stack = descend_tree(i,j,board, stack,word)
-    print(f"FINAL STACK: {stack}")
-
-print("\n")
-if len(stack) == len(word):
-    print("MATCH FOUND")
-else:
-    print("NO MATCH FOUND")
\ No newline at end of file
+if __name__ == "__main__":
+    print("Board:")
+    for line in board:
+        print(line)
+    print('-'*30)
+    print(f"Match Word: {word}")
+    print('-'*30)
+    stack = []
+
+    for i,j in base(board, word):
+        if len(stack) == len(word): break
+        stack.append((i,j))
+        print((i,j))
+        stack = descend_tree(i,j,board, stack,word)
+        print(f"FINAL STACK: {stack}")
+
+    print("\n")
+    if len(stack) == len(word):
+        print("MATCH FOUND")
+    else:
+        print("NO MATCH FOUND")
+
+    print("\n")
+    benchmark()
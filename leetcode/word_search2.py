@@ -1,30 +1,122 @@
+# https://leetcode.com/problems/word-search-ii/
+# find every word from a list that can be traced on the board
+#
+# word_search.py looks for one word at a time, so 10^4 words means 10^4 full
+# passes over the board. here all the words go into one prefix trie and a
+# single dfs from each cell walks the board and the trie together:
+# - a path on the board is only extended while it is still a prefix of a word
+# - a visited cell is marked in place on the board (no `not in stack` scans)
+# - a found word is removed from the trie, and branches with no words left are
+#   cut off, so later searches don't walk them again
+import random
+import string
+import time
+from typing import Dict, List
 
-m, n = len(board), len(board[0])
+from word_search import exist
 
-stack = []
-visited = ()
+# key under which a trie node stores the word that ends there
+WORD = "$"
+VISITED = "#"
 
-def adjacent(board, i, j, visited):
-    adj = []
-    if i-1 >= 0 and (i-1, j) not in visited:
-        adj.append(i-1,j)
-    if i+1 < len(board) and (i+1, j) not in visited
-        adj.append(i+1, j)
-    if j-1 >= 0 and (i, j-1) not in visited
-        adj.append(i,j-1)
-    if j+1 < len(board[0]) and (i,j+1) not in visited:
-        adj.append(i, j+1)
-    return adj
 
-def dfs(i, j, board, stack, visited):
-    node = board(i,j)
-    if node not in visited:
-        print((i,j), board[i][j])
-        visited.add(node)
-        for ii, jj in adjacent(board, i, j, visited):
-            
+def build_trie(words: List[str]) -> dict:
+    root: Dict = {}
+    for word in words:
+        node = root
+        for letter in word:
+            node = node.setdefault(letter, {})
+        node[WORD] = word
+    return root
 
 
-for i in range(m):
-    for j in range(n):
+def dfs(board: List[List[str]], i: int, j: int, parent: dict, found: List[str]) -> None:
+    letter = board[i][j]
+    node = parent[letter]
+    word = node.pop(WORD, None)
+    if word is not None:
+        found.append(word)
 
+    board[i][j] = VISITED
+    if i > 0 and board[i - 1][j] in node:
+        dfs(board, i - 1, j, node, found)
+    if i < len(board) - 1 and board[i + 1][j] in node:
+        dfs(board, i + 1, j, node, found)
+    if j > 0 and board[i][j - 1] in node:
+        dfs(board, i, j - 1, node, found)
+    if j < len(board[0]) - 1 and board[i][j + 1] in node:
+        dfs(board, i, j + 1, node, found)
+    board[i][j] = letter
+
+    # nothing left under this letter, prune it from the trie
+    if not node:
+        del parent[letter]
+
+
+class Solution:
+    def findWords(self, board: List[List[str]], words: List[str]) -> List[str]:
+        root = build_trie(words)
+        found: List[str] = []
+        for i in range(len(board)):
+            for j in range(len(board[0])):
+                if board[i][j] in root:
+                    dfs(board, i, j, root, found)
+                if not root:
+                    # every word is found
+                    return found
+        return found
+
+
+# =================================================================
+#	benchmark: 10^4 words on a 50x50 board
+# =================================================================
+
+def random_board(m: int, n: int, letters: str, seed: int = 0) -> List[List[str]]:
+    rng = random.Random(seed)
+    return [[rng.choice(letters) for _ in range(n)] for _ in range(m)]
+
+
+def random_words(board: List[List[str]], count: int, seed: int = 0) -> List[str]:
+    """half traced on the board (hits), half random letters (mostly misses)"""
+    rng = random.Random(seed)
+    m, n = len(board), len(board[0])
+    letters = sorted({letter for row in board for letter in row})
+    words = set()
+    while len(words) < count // 2:
+        i, j = rng.randrange(m), rng.randrange(n)
+        path = {(i, j)}
+        word = board[i][j]
+        for _ in range(rng.randint(2, 9)):
+            options = [
+                (a, b)
+                for a, b in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1))
+                if 0 <= a < m and 0 <= b < n and (a, b) not in path
+            ]
+            if not options:
+                break
+            i, j = rng.choice(options)
+            path.add((i, j))
+            word += board[i][j]
+        words.add(word)
+    while len(words) < count:
+        words.add("".join(rng.choices(letters, k=rng.randint(3, 10))))
+    return sorted(words)
+
+
+if __name__ == "__main__":
+    board = random_board(50, 50, string.ascii_lowercase[:12])
+    words = random_words(board, 10_000)
+
+    start = time.perf_counter()
+    found = Solution().findWords(board, words)
+    trie_seconds = time.perf_counter() - start
+
+    # one word at a time with word_search.exist in a loop
+    start = time.perf_counter()
+    single = [word for word in words if exist(board, word)]
+    loop_seconds = time.perf_counter() - start
+
+    assert sorted(found) == single
+    print(f"{len(words):,} words on 50x50, {len(found):,} found")
+    print(f"  trie: {trie_seconds:8.3f} s")
+    print(f"  loop: {loop_seconds:8.3f} s ({loop_seconds / trie_seconds:.1f}x)")
@@ -0,0 +1,180 @@
+"""
+k-fold cross validation of the keras_intro.py MLP, one fold per worker process.
+
+Every fold trains a fresh 8-12-8-8-1 network on k-1 parts of the Pima
+dataset and is scored on the part it never saw. The folds are independent, so
+they run side by side in a process pool; each worker is pinned to a few CPU
+threads so the workers don't fight over the cores.
+
+Usage:
+$ python cross_validate.py
+$ python cross_validate.py --folds 10 --workers 4 --threads 1 --batch-size 128
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import get_context
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+from pima import CACHE_DIR, load, split
+
+
+class Fold(NamedTuple):
+    fold: int
+    loss: float
+    accuracy: float
+    seconds: float
+
+
+def build_model():
+    """the keras_intro.py network"""
+    from keras.layers import Dense
+    from keras.models import Sequential
+
+    model = Sequential()
+    model.add(Dense(12, input_dim=8, init='uniform', activation='relu'))
+    model.add(Dense(8, init='uniform', activation='relu'))
+    model.add(Dense(8, init='uniform', activation='relu'))
+    model.add(Dense(1, init='uniform', activation='sigmoid'))
+    model.compile(loss='binary_crossentropy', optimizer='adam', metrics=['accuracy'])
+    return model
+
+
+def folds(n: int, k: int, seed: int) -> List[np.ndarray]:
+    """the row indices of k shuffled, (nearly) equal parts"""
+    return np.array_split(np.random.RandomState(seed).permutation(n), k)
+
+
+# =================================================================
+#	workers
+# =================================================================
+# BLAS reads OMP/MKL/OPENBLAS_NUM_THREADS once, when numpy loads it, and a
+# spawned worker imports numpy (through this module and pima) before it runs
+# anything. so the limits are set in the parent's environment while the pool
+# starts its workers, which inherit it, and put back afterwards. keras is only
+# imported inside the worker, so its backend sees them too
+
+THREAD_VARIABLES = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+@contextmanager
+def thread_limits(threads: int) -> Iterator[None]:
+    limits = {name: str(threads) for name in THREAD_VARIABLES}
+    # theano's openmp goes by OMP_NUM_THREADS, tensorflow reads these
+    limits["TF_NUM_INTRAOP_THREADS"] = str(threads)
+    limits["TF_NUM_INTEROP_THREADS"] = "1"
+    previous = {name: os.environ.get(name) for name in limits}
+    os.environ.update(limits)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def train_fold(
+    fold: int, test: np.ndarray, cache_dir: str, epochs: int, batch_size: int, seed: int
+) -> Fold:
+    np.random.seed(seed + fold)
+    X, Y = split(load(cache_dir=cache_dir))
+    train = np.setdiff1d(np.arange(len(X)), test)
+    model = build_model()
+    start = time.perf_counter()
+    model.fit(X[train], Y[train], nb_epoch=epochs, batch_size=batch_size, verbose=0)
+    seconds = time.perf_counter() - start
+    loss, accuracy = model.evaluate(X[test], Y[test], verbose=0)
+    return Fold(fold, float(loss), float(accuracy), seconds)
+
+
+def cross_validate(
+    k: int = 5,
+    workers: Optional[int] = None,
+    threads: int = 1,
+    epochs: int = 500,
+    batch_size: int = 10,
+    seed: int = 0,
+    cache_dir: str = CACHE_DIR,
+) -> List[Fold]:
+    # fill the cache here, once, rather than k workers downloading at once
+    n = len(load(cache_dir=cache_dir))
+    workers = workers or max(1, min(k, (os.cpu_count() or 1) // threads))
+    # the workers are started as jobs are submitted, all inside thread_limits
+    with thread_limits(threads), ProcessPoolExecutor(
+        max_workers=workers, mp_context=get_context("spawn")
+    ) as pool:
+        jobs = [
+            pool.submit(train_fold, fold, test, cache_dir, epochs, batch_size, seed)
+            for fold, test in enumerate(folds(n, k, seed))
+        ]
+        return [job.result() for job in jobs]
+
+
+def summary(results: List[Fold]) -> Dict[str, float]:
+    loss = np.array([r.loss for r in results])
+    accuracy = np.array([r.accuracy for r in results])
+    return {
+        "loss_mean": float(loss.mean()),
+        "loss_std": float(loss.std()),
+        "accuracy_mean": float(accuracy.mean()),
+        "accuracy_std": float(accuracy.std()),
+        "train_seconds": float(sum(r.seconds for r in results)),
+    }
+
+
+def main():
+    """Script entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, help="default: cores / threads")
+    parser.add_argument("--threads", type=int, default=1, help="CPU threads per worker")
+    parser.add_argument("--epochs", type=int, default=500)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=10,
+        help="keras_intro.py uses 10, 64-256 is far fewer updates per epoch",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--output", help="write the folds and summary as json")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = cross_validate(
+        args.folds,
+        args.workers,
+        args.threads,
+        args.epochs,
+        args.batch_size,
+        args.seed,
+        args.cache_dir,
+    )
+    wall = time.perf_counter() - start
+    for r in results:
+        print(f"fold {r.fold}: loss {r.loss:.4f}, accuracy {r.accuracy:.2%}, {r.seconds:.1f} s")
+    stats = summary(results)
+    print(
+        f"accuracy {stats['accuracy_mean']:.2%} +/- {stats['accuracy_std']:.2%}, "
+        f"{wall:.1f} s wall for {stats['train_seconds']:.1f} s of training"
+    )
+    if args.output:
+        with open(args.output, "w") as destination:
+            report = {"folds": [r._asdict() for r in results], "summary": stats}
+            json.dump(report, destination, indent=2)
+        print(f'Wrote "{args.output}"')
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("Aborted")
@@ -4,28 +4,27 @@ http://machinelearningmastery.com/tutorial-first-neural-network-python-keras/
 
 TO DO :
 - split the dataset into train, test, validate
-- cross validation??? or plot NN performance over time
+- cross validation??? (see cross_validate.py) or plot NN performance over time
 - find other ways to evaluate model performance
 """
 # Create first network with Keras
 from keras.models import Sequential
 from keras.layers import Dense
-import matplotlib.pyplot as plt
 import numpy as np
-import urllib
+
+from pima import load, split
+from training_metrics import EpochTimer, render
 
 # fix random seed for reproducibility
 np.random.seed(0)
 
 #===================================================================
-# load data set from url
+# load data set
 #===================================================================
-# URL for the Pima Indians Diabetes dataset (UCI Machine Learning Repository)
-url = "http://goo.gl/j0Rvxq"
-# download the file
-raw_data = urllib.urlopen(url)
-# load the CSV file as a numpy matrix
-dataset = np.loadtxt(raw_data, delimiter=",")
+# Pima Indians Diabetes dataset (UCI Machine Learning Repository)
+# the first run downloads and parses the CSV, later runs memory map the
+# cached .npy (see pima.py)
+dataset = load()
 print(dataset.shape)
 
 
@@ -34,9 +33,8 @@ print(dataset.shape)
 #===================================================================
 # this is typically where I would train, test, validate Split
 # but lets wait as this is still our first steps with NN in Keras
-# split into input (X) and output (Y) variables
-X = dataset[:,0:8]
-Y = dataset[:,8]
+# split into input (X) and output (Y) variables, both are views of dataset
+X, Y = split(dataset)
 
 
 #===================================================================
@@ -50,8 +48,11 @@ model.add(Dense(8, init='uniform', activation='relu'))
 model.add(Dense(1, init='uniform', activation='sigmoid'))
 # Compile model
 model.compile(loss='binary_crossentropy', optimizer='adam', metrics=['accuracy'])
-# Fit the model
-history = model.fit(X, Y, validation_split=0.33, nb_epoch=500, batch_size=10, verbose=0)
+# Fit the model, EpochTimer writes each epoch's time and samples/s as it goes
+# (tail -f keras_intro.jsonl)
+timer = EpochTimer('keras_intro.jsonl')
+history = model.fit(X, Y, validation_split=0.33, nb_epoch=500, batch_size=10, verbose=0,
+                    callbacks=[timer])
 
 
 #===================================================================
@@ -68,19 +69,7 @@ history = model.fit(X, Y, validation_split=0.33, nb_epoch=500, batch_size=10, ve
 #http://machinelearningmastery.com/display-deep-learning-model-training-history-in-keras/
 # list all data in history
 print(history.history.keys())
-# summarize history for accuracy
-plt.plot(history.history['acc'])
-plt.plot(history.history['val_acc'])
-plt.title('model accuracy')
-plt.ylabel('accuracy')
-plt.xlabel('epoch')
-plt.legend(['train', 'test'], loc='upper left')
-plt.show()
-# summarize history for loss
-plt.plot(history.history['loss'])
-plt.plot(history.history['val_loss'])
-plt.title('model loss')
-plt.ylabel('loss')
-plt.xlabel('epoch')
-plt.legend(['train', 'test'], loc='upper left')
-plt.show()
+# accuracy, loss and samples/s per epoch, saved as a PNG instead of plt.show()
+# so it also works without a display
+render('keras_intro.jsonl', 'keras_intro.png')
+print('Wrote "keras_intro.png"')
@@ -0,0 +1,133 @@
+"""
+The Pima Indians Diabetes dataset for keras_intro.py, parsed once and cached.
+
+The first run parses the CSV (a local copy if there is one, otherwise it is
+downloaded) and saves the float array as .npy, with the path, size and mtime
+of the CSV it came from. Every run after that memory maps the .npy, no text
+parsing and no network, until that CSV changes.
+
+    dataset = load()
+    X, Y = split(dataset)
+
+Usage:
+$ python pima.py                          # fill the cache
+$ python pima.py --csv pima-indians-diabetes.data.csv
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import urllib.request
+from typing import Optional, Tuple
+
+import numpy as np
+
+# the goo.gl link in the tutorial is gone, this is the same file
+URL = "https://raw.githubusercontent.com/jbrownlee/Datasets/master/pima-indians-diabetes.data.csv"
+CACHE_DIR = os.environ.get("PIMA_CACHE", os.path.expanduser("~/.cache/pima"))
+NAME = "pima-indians-diabetes"
+# 8 measurements then the 0/1 outcome
+FEATURES = 8
+
+
+def load(csv: Optional[str] = None, cache_dir: str = CACHE_DIR) -> np.ndarray:
+    """the dataset as a read only (768, 9) float64 memory map
+
+    looks for, in order: the .npy cache, the csv (given, or a copy in the
+    cache dir), the URL. the network is only used to fill the copy in the
+    cache dir, a csv that is given has to exist
+    """
+    cache = cache_path(csv, cache_dir)
+    given = csv is not None
+    csv = csv or os.path.join(cache_dir, NAME + ".csv")
+    if given and not os.path.exists(csv):
+        raise FileNotFoundError(f"no such csv: {csv}")
+    if is_fresh(cache, csv):
+        return np.load(cache, mmap_mode="r")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    if not os.path.exists(csv):
+        download(URL, csv)
+    dataset = np.loadtxt(csv, delimiter=",", dtype=np.float64)
+    # write next to the cache and rename, so a killed run never leaves half a file
+    partial = cache + ".partial"
+    with open(partial, "wb") as destination:
+        np.save(destination, dataset)
+    os.replace(partial, cache)
+    # which csv it came from, written last: a run killed before this leaves a
+    # record that doesn't match and the csv just gets parsed again
+    stat = os.stat(csv)
+    source = {
+        "path": os.path.abspath(csv),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+    with open(partial, "w") as destination:
+        json.dump(source, destination)
+    os.replace(partial, cache + ".source")
+    return np.load(cache, mmap_mode="r")
+
+
+def cache_path(csv: Optional[str], cache_dir: str) -> str:
+    """one .npy per csv: the default copy gets NAME.npy, any other csv a name
+    keyed on its absolute path, so one csv's cache is never served for another"""
+    if csv is None:
+        return os.path.join(cache_dir, NAME + ".npy")
+    stem = os.path.splitext(os.path.basename(csv))[0]
+    key = hashlib.sha1(os.path.abspath(csv).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{stem}-{key}.npy")
+
+
+def is_fresh(cache: str, csv: str) -> bool:
+    """the cache exists and was parsed from csv as it is now
+
+    the csv may be gone (e.g. deleted after the download), then the cache is
+    all there is and it is used as is
+    """
+    try:
+        with open(cache + ".source") as source:
+            recorded = json.load(source)
+    except (FileNotFoundError, ValueError):
+        return False
+    if not os.path.exists(cache) or recorded.get("path") != os.path.abspath(csv):
+        return False
+    if not os.path.exists(csv):
+        return True
+    stat = os.stat(csv)
+    return (recorded.get("size"), recorded.get("mtime_ns")) == (
+        stat.st_size,
+        stat.st_mtime_ns,
+    )
+
+
+def download(url: str, destination: str) -> None:
+    partial = destination + ".partial"
+    with urllib.request.urlopen(url) as response, open(partial, "wb") as out:
+        out.write(response.read())
+    os.replace(partial, destination)
+
+
+def split(dataset: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """input (X) and output (Y) columns, views into dataset (nothing is copied)"""
+    return dataset[:, :FEATURES], dataset[:, FEATURES]
+
+
+def main():
+    """Script entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--csv", help="a local copy of the csv, instead of the URL")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    args = parser.parse_args()
+
+    dataset = load(args.csv, args.cache_dir)
+    X, Y = split(dataset)
+    print(f"{dataset.shape} cached in {args.cache_dir}")
+    print(f"X {X.shape}, Y {Y.shape}, {int(Y.sum())} positive")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("Aborted")
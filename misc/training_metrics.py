@@ -0,0 +1,141 @@
+"""
+Per epoch timing for Keras training, written to disk while it trains.
+
+history.history only has the loss/accuracy and only once fit() returns. The
+EpochTimer callback adds, for every epoch: the wall time, samples per second
+and the mean/max time per batch, and appends them as one JSON line (or CSV
+row) as soon as the epoch ends, so a long or headless run can be watched with
+tail -f. render() turns such a file into a PNG without opening a window.
+
+    timer = EpochTimer("metrics.jsonl")
+    model.fit(X, Y, ..., callbacks=[timer])
+    render("metrics.jsonl", "metrics.png")
+
+Usage:
+$ python training_metrics.py metrics.jsonl metrics.png
+"""
+
+import argparse
+import csv
+import json
+import time
+from typing import Dict, List, Optional
+
+from keras.callbacks import Callback
+
+
+class EpochTimer(Callback):
+    def __init__(self, path: str, format: Optional[str] = None) -> None:
+        super().__init__()
+        self.path = path
+        # jsonl or csv, from the file name if not given
+        self.format = format or ("csv" if path.endswith(".csv") else "jsonl")
+        self.rows: List[Dict[str, float]] = []
+        self._file = None
+        self._writer = None
+
+    def on_train_begin(self, logs=None):
+        self._file = open(self.path, "w", newline="")
+        self._writer = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._batches: List[float] = []
+        self._samples = 0
+        self._epoch_start = time.perf_counter()
+
+    def on_batch_begin(self, batch, logs=None):
+        self._batch_start = time.perf_counter()
+
+    def on_batch_end(self, batch, logs=None):
+        self._batches.append(time.perf_counter() - self._batch_start)
+        # keras passes the size of every batch, the last one is usually smaller
+        self._samples += (logs or {}).get("size", 0)
+
+    def on_epoch_end(self, epoch, logs=None):
+        seconds = time.perf_counter() - self._epoch_start
+        batches = self._batches or [0.0]
+        row = {
+            "epoch": epoch,
+            "seconds": seconds,
+            "samples": self._samples,
+            "samples_per_second": self._samples / seconds if seconds else 0.0,
+            "batches": len(self._batches),
+            "batch_seconds_mean": sum(batches) / len(batches),
+            "batch_seconds_max": max(batches),
+        }
+        # loss, acc, val_loss, val_acc
+        row.update({key: float(value) for key, value in (logs or {}).items()})
+        self.rows.append(row)
+        self._write(row)
+
+    def on_train_end(self, logs=None):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, row: Dict[str, float]) -> None:
+        if self.format == "csv":
+            if self._writer is None:
+                self._writer = csv.DictWriter(self._file, fieldnames=list(row))
+                self._writer.writeheader()
+            self._writer.writerow(row)
+        else:
+            self._file.write(json.dumps(row) + "\n")
+        # flush every epoch so the file can be followed while training runs
+        self._file.flush()
+
+
+def read(path: str) -> List[Dict[str, float]]:
+    with open(path, newline="") as source:
+        if path.endswith(".csv"):
+            return [{k: float(v) for k, v in row.items()} for row in csv.DictReader(source)]
+        return [json.loads(line) for line in source if line.strip()]
+
+
+def render(path: str, destination: str) -> None:
+    """accuracy, loss and epoch throughput of a metrics file, saved as a PNG"""
+    # the Agg backend draws to a file, no display needed and nothing blocks
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    rows = read(path)
+    epochs = [row["epoch"] for row in rows]
+    figure, axes = plt.subplots(3, 1, figsize=(8, 10), sharex=True)
+    # older keras logs "acc", newer "accuracy"
+    for ax, names in zip(axes, (("acc", "accuracy"), ("loss",))):
+        for name in names:
+            for key in (name, "val_" + name):
+                if rows and key in rows[0]:
+                    ax.plot(epochs, [row[key] for row in rows], label=key)
+        ax.set_ylabel(names[-1])
+        ax.legend(loc="upper left")
+    axes[2].plot(epochs, [row["samples_per_second"] for row in rows])
+    axes[2].set_ylabel("samples / s")
+    axes[2].set_xlabel("epoch")
+    axes[0].set_title("model training")
+    figure.tight_layout()
+    figure.savefig(destination)
+    plt.close(figure)
+
+
+def main():
+    """Script entry point."""
+    parser = argparse.ArgumentParser(description="render a metrics file as a PNG")
+    parser.add_argument("path", help="metrics.jsonl or metrics.csv from EpochTimer")
+    parser.add_argument("destination", help="the PNG to write")
+    args = parser.parse_args()
+
+    render(args.path, args.destination)
+    rows = read(args.path)
+    slowest = max(rows, key=lambda row: row["seconds"])
+    print(f"{len(rows)} epochs, slowest: {int(slowest['epoch'])} ({slowest['seconds']:.3f} s)")
+    print(f'Wrote "{args.destination}"')
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("Aborted")